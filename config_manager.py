@@ -1,8 +1,26 @@
-import json
 import os
 import logging
 import sys
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List
+
+# Prefer orjson when available, falling back to the standard library
+try:
+    import orjson
+    
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+    
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+    
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=4, ensure_ascii=False).encode('utf-8')
 
 class ConfigManager:
     """Manages application settings persistence"""
@@ -18,41 +36,50 @@ class ConfigManager:
                 self.config_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
                 
             self.config_file = os.path.join(self.config_dir, config_file)
-            logging.info(f"Config file path: {self.config_file}")
+            logging.info("Config file path: %s", self.config_file)
             
             self.default_settings = {
                 "source_type": "Webcam",
                 "resolution": "640x480",
                 "protocol": "HTTP",
-                "port": "5000"
+                "port": "5000",
+                "jpeg_quality": 80,
+                "stream_max_width": 0,
+                "websocket_codec": "jpeg",
+                "mjpeg_passthrough": False
             }
             
+            # Last enumerated camera list, preserved across GUI saves
+            self._camera_cache = None
+            
             # Ensure the config directory exists
-            if not os.path.exists(self.config_dir):
-                os.makedirs(self.config_dir)
-                logging.info(f"Created config directory: {self.config_dir}")
+            os.makedirs(self.config_dir, exist_ok=True)
                 
         except Exception as e:
-            logging.error(f"Error initializing ConfigManager: {str(e)}")
+            logging.error("Error initializing ConfigManager: %s", e)
             raise
     
     def load_settings(self) -> Dict[str, Any]:
         """Load settings from file, return defaults if file doesn't exist"""
         try:
-            if os.path.exists(self.config_file):
-                logging.info(f"Loading settings from: {self.config_file}")
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    settings = json.load(f)
-                logging.info(f"Loaded settings: {settings}")
-                merged_settings = {**self.default_settings, **settings}
-                logging.info(f"Merged with defaults: {merged_settings}")
-                return merged_settings
-                
-            logging.info(f"No settings file found at {self.config_file}, using defaults: {self.default_settings}")
+            logging.info("Loading settings from: %s", self.config_file)
+            with open(self.config_file, 'rb') as f:
+                settings = _loads(f.read())
+            if isinstance(settings.get("cameras"), dict):
+                self._camera_cache = settings["cameras"]
+            merged_settings = self.default_settings.copy()
+            merged_settings.update(settings)
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                logging.info("Loaded settings: %s", settings)
+                logging.info("Merged with defaults: %s", merged_settings)
+            return merged_settings
+            
+        except FileNotFoundError:
+            logging.info("No settings file found at %s, using defaults: %s", self.config_file, self.default_settings)
             return self.default_settings.copy()
             
         except Exception as e:
-            logging.error(f"Error loading settings from {self.config_file}: {str(e)}")
+            logging.error("Error loading settings from %s: %s", self.config_file, e)
             return self.default_settings.copy()
     
     def save_settings(self, settings: Dict[str, Any]) -> bool:
@@ -60,14 +87,33 @@ class ConfigManager:
         try:
             # Filter out None values and empty strings
             filtered_settings = {k: v for k, v in settings.items() if v is not None and v != ""}
-            logging.info(f"Saving settings to {self.config_file}: {filtered_settings}")
             
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(filtered_settings, f, indent=4, ensure_ascii=False)
+            # Keep the cached camera list unless the caller replaces it
+            if "cameras" not in filtered_settings and self._camera_cache is not None:
+                filtered_settings["cameras"] = self._camera_cache
+            logging.info("Saving settings to %s: %s", self.config_file, filtered_settings)
+            
+            with open(self.config_file, 'wb') as f:
+                f.write(_dumps(filtered_settings))
             
-            logging.info(f"Settings saved successfully to {self.config_file}")
+            logging.info("Settings saved successfully to %s", self.config_file)
             return True
             
         except Exception as e:
-            logging.error(f"Error saving settings to {self.config_file}: {str(e)}")
-            return False 
\ No newline at end of file
+            logging.error("Error saving settings to %s: %s", self.config_file, e)
+            return False
+    
+    def get_cached_cameras(self) -> List[Dict[str, Any]]:
+        """Return the camera list cached by the last enumeration, if any"""
+        if self._camera_cache is None:
+            self.load_settings()
+        if self._camera_cache is None:
+            return []
+        return list(self._camera_cache.get("devices", []))
+    
+    def set_cached_cameras(self, cameras: List[Dict[str, Any]]) -> bool:
+        """Cache the enumerated camera list with a timestamp"""
+        settings = self.load_settings()
+        self._camera_cache = {"timestamp": time.time(), "devices": cameras}
+        settings["cameras"] = self._camera_cache
+        return self.save_settings(settings)
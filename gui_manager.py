@@ -1,15 +1,160 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk
-import cv2
 import os
 import logging
-from typing import Optional
-from source_manager import VideoSource, SourceFactory
-from streaming_service import StreamingService, StreamingServiceFactory
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
 from config_manager import ConfigManager
 import threading
-import webbrowser
+import queue
+import time
+import functools
+
+if TYPE_CHECKING:
+    from source_manager import VideoSource
+    from streaming_service import StreamingService
+
+# OpenCV (and NumPy with it) is imported on first use to speed up startup
+_cv2 = None
+
+def _get_cv2():
+    """Import OpenCV lazily and cache the module"""
+    global _cv2
+    if _cv2 is None:
+        import cv2
+        _cv2 = cv2
+    return _cv2
+
+@functools.lru_cache(maxsize=1)
+def _detect_local_ip() -> str:
+    """Get the address of the interface used for outbound traffic"""
+    try:
+        import socket
+        # UDP connect sends nothing; the timeout only guards a stalled route lookup
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.settimeout(0.1)
+            s.connect(("8.8.8.8", 80))
+            return s.getsockname()[0]
+    except:
+        return "127.0.0.1"
+
+def _parse_bool(value, default: bool = False) -> bool:
+    """Read a hand-edited flag; unknown values keep the default"""
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('true', '1', 'yes', 'on'):
+        return True
+    if text in ('false', '0', 'no', 'off', ''):
+        return False
+    logging.error("Invalid boolean setting %r, using %s", value, default)
+    return default
+
+# Fixed paths resolved once at import
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+_ICON_PATH = os.path.join(_MODULE_DIR, 'assets', 'icone.png')
+_WS_EXAMPLE_DIR = os.path.join(_MODULE_DIR, 'client-html-example')
+_WS_EXAMPLE_PATH = os.path.join(_WS_EXAMPLE_DIR, 'index.html')
+
+# Preview size
+PREVIEW_WIDTH, PREVIEW_HEIGHT = 320, 240
+PREVIEW_INTERVAL = 1 / 30  # ~30 FPS
+PREVIEW_POLL_MS = 15
+
+# Delay before auto-saving settings, so bursts of edits write once
+SAVE_DEBOUNCE_MS = 500
+
+# Streaming JPEG quality; 80 is visually close to the default 95 at about half the size
+JPEG_QUALITY = 80
+
+# Frame period of the stream producer (~30 FPS)
+STREAM_INTERVAL = 1 / 30
+
+# Streamed frames wider than this are downscaled before encoding (0 = never)
+STREAM_MAX_WIDTH = 0
+
+# Example WebSocket client, filled in with the server address on demand
+WS_EXAMPLE_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>WebSocket Camera Stream</title>
+    <style>
+        body {{
+            font-family: Arial, sans-serif;
+            margin: 20px;
+            background-color: #f0f0f0;
+        }}
+        h2 {{
+            color: #333;
+        }}
+        #videoCanvas {{
+            border: 2px solid #333;
+            background-color: #fff;
+            max-width: 100%;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }}
+        .container {{
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 20px;
+        }}
+        .status {{
+            margin-top: 10px;
+            color: #666;
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h2>Camera Stream</h2>
+        <canvas id="videoCanvas"></canvas>
+        <div class="status" id="status">Conectando...</div>
+    </div>
+    <script>
+        const canvas = document.getElementById('videoCanvas');
+        const ctx = canvas.getContext('2d');
+        const status = document.getElementById('status');
+        let ws = null;
+        
+        function connect() {{
+            ws = new WebSocket('ws://{ip}:{port}');
+            
+            ws.onopen = function() {{
+                status.textContent = 'Conectado';
+                status.style.color = 'green';
+            }};
+            
+            ws.onmessage = function(event) {{
+                const reader = new FileReader();
+                reader.onload = function() {{
+                    const img = new Image();
+                    img.onload = function() {{
+                        canvas.width = img.width;
+                        canvas.height = img.height;
+                        ctx.drawImage(img, 0, 0);
+                    }};
+                    img.src = reader.result;
+                }};
+                reader.readAsDataURL(event.data);
+            }};
+            
+            ws.onclose = function() {{
+                status.textContent = 'Desconectado - Tentando reconectar...';
+                status.style.color = 'red';
+                setTimeout(connect, 3000);
+            }};
+            
+            ws.onerror = function(err) {{
+                status.textContent = 'Erro na conexão';
+                status.style.color = 'red';
+            }};
+        }}
+        
+        connect();
+    </script>
+</body>
+</html>
+"""
 
 class PreviewManager:
     """Manages the preview window and frame updates"""
@@ -17,38 +162,140 @@ class PreviewManager:
     def __init__(self, preview_frame: ttk.Label):
         self.preview_frame = preview_frame
         self.is_active = False
-        self.current_source: Optional[VideoSource] = None
+        self.current_source: Optional["VideoSource"] = None
+        
+        # Reused across frames to avoid per-frame allocations
+        self._resized_buf = None
+        self._use_umat = False
+        self._interp = None
+        
+        # One Tk image for the whole session; the label redraws when its data changes
+        self._photo = tk.PhotoImage(width=PREVIEW_WIDTH, height=PREVIEW_HEIGHT)
+        
+        # Capture runs in its own thread; only the newest frame is kept
+        self._lock = threading.Lock()
+        self._latest = None
+        self._stop = threading.Event()
+        self._capture_thread: Optional[threading.Thread] = None
+        self._poll_id: Optional[str] = None
+        
+        # Cleared while the window is minimized to pause capture and redraw
+        self._visible = threading.Event()
+        self._visible.set()
     
-    def start_preview(self, source: VideoSource) -> bool:
+    def set_visible(self, visible: bool) -> None:
+        """Pause preview work while the window is hidden"""
+        if visible:
+            self._visible.set()
+        else:
+            self._visible.clear()
+    
+    def start_preview(self, source: "VideoSource") -> bool:
         try:
             if not source.is_opened() and not source.open():
                 raise ValueError("Could not open source")
             
+            cv2 = _get_cv2()
+            
+            # Use OpenCL for resize/convert when the device supports it
+            try:
+                cv2.ocl.setUseOpenCL(True)
+                self._use_umat = cv2.ocl.haveOpenCL()
+            except Exception as e:
+                logging.debug("OpenCL unavailable: %s", e)
+                self._use_umat = False
+            
+            self.preview_frame.configure(image=self._photo)
+            self._interp = None
             self.current_source = source
             self.is_active = True
+            
+            self._stop.clear()
+            self._capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self._capture_thread.start()
+            self._poll()
             return True
         except Exception as e:
-            logging.error(f"Error starting preview: {str(e)}")
+            logging.error("Error starting preview: %s", e)
             return False
     
     def stop_preview(self) -> None:
         self.is_active = False
+        if self._poll_id:
+            self.preview_frame.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._stop.set()
+        if self._capture_thread:
+            self._capture_thread.join(timeout=1.0)
+            self._capture_thread = None
+        
+        # Discard any frame left behind by the capture thread
+        with self._lock:
+            self._latest = None
+        
         if self.current_source:
             self.current_source.release()
             self.current_source = None
     
+    def _capture_loop(self) -> None:
+        """Read frames off the Tk thread, keeping only the newest one"""
+        source = self.current_source
+        while not self._stop.is_set():
+            if not self._visible.is_set():
+                self._visible.wait(0.2)
+                continue
+            
+            started = time.monotonic()
+            ret, frame = source.read_frame()
+            if ret:
+                with self._lock:
+                    self._latest = frame
+            
+            # Sources that never block (e.g. static images) are capped at ~30 FPS
+            self._stop.wait(max(0.0, PREVIEW_INTERVAL - (time.monotonic() - started)))
+    
+    def _poll(self) -> None:
+        """Check for a new frame on the Tk thread while the preview runs"""
+        if not self.is_active:
+            return
+        if self._visible.is_set():
+            self.update_frame()
+        self._poll_id = self.preview_frame.after(PREVIEW_POLL_MS, self._poll)
+    
     def update_frame(self) -> None:
         if not self.is_active or not self.current_source:
             return
-            
-        ret, frame = self.current_source.read_frame()
-        if ret:
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame = cv2.resize(frame, (320, 240))
-            image = Image.fromarray(frame)
-            photo = ImageTk.PhotoImage(image=image)
-            self.preview_frame.configure(image=photo)
-            self.preview_frame.image = photo
+        
+        with self._lock:
+            frame, self._latest = self._latest, None
+        if frame is None:
+            return
+        
+        cv2 = _get_cv2()
+        if self._interp is None:
+            # INTER_AREA when shrinking (integer ratios such as 640x480 hit OpenCV's
+            # specialized box-filter path), INTER_LINEAR when enlarging
+            height, width = frame.shape[:2]
+            self._interp = cv2.INTER_AREA if width * height > PREVIEW_WIDTH * PREVIEW_HEIGHT else cv2.INTER_LINEAR
+        
+        if self._use_umat:
+            resized = cv2.resize(cv2.UMat(frame), (PREVIEW_WIDTH, PREVIEW_HEIGHT), interpolation=self._interp).get()
+        else:
+            # Sized from the first frame so the channel layout matches the source
+            shape = (PREVIEW_HEIGHT, PREVIEW_WIDTH) + frame.shape[2:]
+            if self._resized_buf is None or self._resized_buf.shape != shape or self._resized_buf.dtype != frame.dtype:
+                import numpy as np
+                self._resized_buf = np.empty(shape, frame.dtype)
+            cv2.resize(frame, (PREVIEW_WIDTH, PREVIEW_HEIGHT), dst=self._resized_buf, interpolation=self._interp)
+            resized = self._resized_buf
+        
+        # OpenCV writes PPM pixels as RGB itself, so the BGR frame goes in as is
+        ok, buffer = cv2.imencode('.ppm', resized)
+        if not ok:
+            return
+        
+        # Hand Tk the binary PPM directly, no PIL round-trip
+        self._photo.configure(data=buffer.tobytes(), format='PPM')
 
 class WebcamIPGUI:
     """Main GUI class following Single Responsibility Principle"""
@@ -60,12 +307,30 @@ class WebcamIPGUI:
         
         # Initialize managers
         self.preview_manager = None  # Will be initialized after GUI creation
-        self.current_service: Optional[StreamingService] = None
+        self.current_service: Optional["StreamingService"] = None
+        self._service_key: Optional[Tuple[str, int]] = None
+        self._idle_service: Tuple[Optional[Tuple[str, int]], Optional["StreamingService"]] = (None, None)
         self.server_thread: Optional[threading.Thread] = None
+        self._stream_stop: Optional[threading.Event] = None
+        self._latest_frame: Tuple[Union[bytes, memoryview], threading.Event] = (b'', threading.Event())
+        # Connected stream clients, reported by the service; the producer idles at zero
+        self._client_count = 0
+        self._clients_changed = threading.Condition()
+        self._url_cache: Dict[Tuple[str, str, str], str] = {}
+        self._ws_example_written: Optional[Tuple[str, str]] = None
+        self._save_after_id: Optional[str] = None
+        self._resolution: Tuple[int, int] = (640, 480)
+        self._jpeg_quality = JPEG_QUALITY
+        self._stream_max_width = STREAM_MAX_WIDTH
+        self._websocket_codec = "jpeg"
+        self._mjpeg_passthrough = False
+        self._last_saved_settings: Optional[Dict[str, object]] = None
         
-        # Get available cameras first
-        self.available_cameras = SourceFactory.get_available_cameras()
-        logging.info(f"Found cameras: {[info['name'] for info in self.available_cameras]}")
+        # Start from the cached camera list; a fresh enumeration runs in background
+        self.available_cameras = self.config_manager.get_cached_cameras()
+        if not self.available_cameras:
+            self.available_cameras = [{"index": 0, "name": "Detecting cameras..."}]
+        logging.info("Cached cameras: %s", [info['name'] for info in self.available_cameras])
         
         # Create GUI elements
         self.create_gui()
@@ -81,6 +346,9 @@ class WebcamIPGUI:
         
         # Setup settings auto-save
         self.setup_auto_save()
+        
+        # Refresh the camera list without blocking the mainloop
+        self._refresh_cameras_async()
     
     def setup_window(self) -> None:
         """Setup main window properties"""
@@ -90,23 +358,33 @@ class WebcamIPGUI:
         
         # Set application icon
         try:
-            icon_path = os.path.join(os.path.dirname(__file__), 'assets', 'icone.png')
-            icon_image = tk.PhotoImage(file=icon_path)
+            icon_image = tk.PhotoImage(file=_ICON_PATH)
             self.root.iconphoto(True, icon_image)
         except Exception as e:
-            logging.warning(f"Could not load application icon: {str(e)}")
+            logging.warning("Could not load application icon: %s", e)
     
     def create_gui(self) -> None:
         """Create all GUI elements"""
         style = ttk.Style()
         style.configure('TCombobox', padding=5)
         style.configure('TButton', padding=5)
+        style.configure('Field.TLabel', padding=(0, 5))
         
         self.create_control_frame()
         self.create_preview_frame()
         self.create_status_frame()
         self.create_button_frame()
         
+        # Controls locked while streaming: 'ro' combos go back to readonly, 'rw' to normal
+        self._lockable = [
+            (self.source_type_combo, 'ro'),
+            (self.camera_combo, 'ro'),
+            (self.source_button, 'rw'),
+            (self.resolution_combo, 'ro'),
+            (self.protocol_combo, 'ro'),
+            (self.port_entry, 'rw'),
+        ]
+        
         # Configure minimum window size
         self.root.update()
         self.root.minsize(self.root.winfo_width(), self.root.winfo_height())
@@ -118,18 +396,20 @@ class WebcamIPGUI:
         control_frame.grid(row=0, column=0, columnspan=3, sticky="ew", padx=5, pady=5)
         control_frame.grid_columnconfigure(1, weight=1)
         
+        # Field labels, one per row
+        field_labels = ("Source Type:", "Select Source:", "Resolution:", "Protocol:", "Port:")
+        for row, text in enumerate(field_labels):
+            ttk.Label(control_frame, text=text, style='Field.TLabel').grid(row=row, column=0, sticky="w")
+        
         current_row = 0
         
         # Source type selection
-        ttk.Label(control_frame, text="Source Type:", padding=(0, 5)).grid(row=current_row, column=0, sticky="w")
         self.source_type_combo = ttk.Combobox(control_frame, state="readonly", values=["Webcam", "Video File", "Static Image"], width=30)
         self.source_type_combo.grid(row=current_row, column=1, columnspan=2, sticky="ew", padx=(5, 0), pady=5)
         self.source_type_combo.current(0)
-        self.source_type_combo.bind('<<ComboboxSelected>>', self.on_source_type_changed)
         current_row += 1
         
         # Camera/File selection
-        ttk.Label(control_frame, text="Select Source:", padding=(0, 5)).grid(row=current_row, column=0, sticky="w")
         self.camera_combo = ttk.Combobox(control_frame, state="readonly", width=30)
         self.camera_combo.grid(row=current_row, column=1, sticky="ew", padx=(5, 0), pady=5)
         
@@ -139,23 +419,20 @@ class WebcamIPGUI:
         current_row += 1
         
         # Resolution selection
-        ttk.Label(control_frame, text="Resolution:", padding=(0, 5)).grid(row=current_row, column=0, sticky="w")
         self.resolution_combo = ttk.Combobox(control_frame, state="readonly", values=['640x480', '800x600', '1280x720', '1920x1080'], width=30)
         self.resolution_combo.grid(row=current_row, column=1, columnspan=2, sticky="ew", padx=(5, 0), pady=5)
         self.resolution_combo.current(0)
         current_row += 1
         
         # Protocol selection
-        ttk.Label(control_frame, text="Protocol:", padding=(0, 5)).grid(row=current_row, column=0, sticky="w")
-        self.protocol_combo = ttk.Combobox(control_frame, state="readonly", values=['HTTP', 'WebSocket'], width=30)
+        self.protocol_var = tk.StringVar(value='HTTP')
+        self.protocol_combo = ttk.Combobox(control_frame, state="readonly", values=['HTTP', 'WebSocket'], width=30, textvariable=self.protocol_var)
         self.protocol_combo.grid(row=current_row, column=1, columnspan=2, sticky="ew", padx=(5, 0), pady=5)
-        self.protocol_combo.current(0)
         current_row += 1
         
         # Port selection
-        ttk.Label(control_frame, text="Port:", padding=(0, 5)).grid(row=current_row, column=0, sticky="w")
-        self.port_entry = ttk.Entry(control_frame, width=32)
-        self.port_entry.insert(0, "5000")
+        self.port_var = tk.StringVar(value='5000')
+        self.port_entry = ttk.Entry(control_frame, width=32, textvariable=self.port_var)
         self.port_entry.grid(row=current_row, column=1, columnspan=2, sticky="ew", padx=(5, 0), pady=5)
         current_row += 1
     
@@ -177,6 +454,11 @@ class WebcamIPGUI:
         self.ip_label = ttk.Label(status_frame, text=f"Local IP: {self.get_local_ip()}", padding=(0, 5))
         self.ip_label.grid(row=0, column=0, sticky="w")
         
+        # Right-click menu to recompute the cached IP address
+        self.ip_menu = tk.Menu(self.root, tearoff=0)
+        self.ip_menu.add_command(label="Refresh IP (F5)", command=self._invalidate_ip_cache)
+        self.ip_label.bind("<Button-3>", lambda e: self.ip_menu.tk_popup(e.x_root, e.y_root))
+        
         self.url_label = ttk.Label(status_frame, text="Stream URL: Not started", padding=(0, 5), cursor="hand2", foreground="blue")
         self.url_label.grid(row=1, column=0, sticky="w")
         self.url_label.bind("<Button-1>", self.open_stream_url)
@@ -202,15 +484,69 @@ class WebcamIPGUI:
             self.camera_combo['values'] = camera_names
             if self.available_cameras:
                 self.camera_combo.current(0)
-                logging.info(f"Loaded cameras into combo box: {camera_names}")
-                logging.info(f"Selected camera index: {self.camera_combo.current()}")
+                logging.info("Loaded cameras into combo box: %s", camera_names)
+                logging.info("Selected camera index: %s", self.camera_combo.current())
         except Exception as e:
-            logging.error(f"Error loading cameras into combo box: {str(e)}")
+            logging.error("Error loading cameras into combo box: %s", e)
             # Add a dummy entry if no cameras are found
             self.available_cameras = [{"index": 0, "name": "No cameras found"}]
             self.camera_combo['values'] = ["No cameras found"]
             self.camera_combo.current(0)
     
+    def _refresh_cameras_async(self) -> None:
+        """Enumerate cameras in the background and hand the result to the GUI"""
+        results: "queue.Queue[Optional[list]]" = queue.Queue(maxsize=1)
+        
+        def enumerate_cameras():
+            cameras = None
+            try:
+                # Importing source_manager loads cv2, so it stays off the Tk thread too
+                from source_manager import SourceFactory
+                cameras = SourceFactory.get_available_cameras()
+            except Exception as e:
+                logging.error("Error refreshing cameras: %s", e)
+            # Tk is not thread-safe, so the Tk thread picks the result up itself
+            results.put(cameras)
+        
+        threading.Thread(target=enumerate_cameras, daemon=True).start()
+        self._poll_camera_refresh(results)
+    
+    def _poll_camera_refresh(self, results: "queue.Queue[Optional[list]]") -> None:
+        """Check on the Tk thread whether the camera enumeration has finished"""
+        try:
+            cameras = results.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self._poll_camera_refresh, results)
+            return
+        if cameras is not None:
+            self._apply_camera_list(cameras)
+    
+    def _apply_camera_list(self, cameras) -> None:
+        """Populate the combo box with a fresh camera list and cache it"""
+        try:
+            # Only real enumeration results are worth caching
+            if cameras:
+                self.config_manager.set_cached_cameras(cameras)
+            else:
+                cameras = [{"index": 0, "name": "No cameras found"}]
+            
+            current_name = self.camera_combo.get()
+            camera_names = [info['name'] for info in cameras]
+            self.available_cameras = cameras
+            self.camera_combo['values'] = camera_names
+            
+            # Keep the current selection, falling back to the saved one
+            if current_name in camera_names:
+                self.camera_combo.current(camera_names.index(current_name))
+            else:
+                selected_camera = self.config_manager.load_settings().get('selected_camera', 0)
+                if not 0 <= selected_camera < len(camera_names):
+                    selected_camera = 0
+                self.camera_combo.current(selected_camera)
+            logging.info("Found cameras: %s", camera_names)
+        except Exception as e:
+            logging.error("Error applying camera list: %s", e)
+    
     def on_source_type_changed(self, event=None) -> None:
         """Handle source type change"""
         source_type = self.source_type_combo.get()
@@ -240,11 +576,14 @@ class WebcamIPGUI:
                 self.source_button.path = path
                 self.save_settings()  # Save settings after selecting file
     
-    def get_current_source(self) -> VideoSource:
+    def get_current_source(self) -> "VideoSource":
         """Get the current video source based on UI selection"""
+        from source_manager import SourceFactory
         source_type = self.source_type_combo.get()
         if source_type == "Webcam":
-            return SourceFactory.create_source("webcam", device_index=self.camera_combo.current())
+            selected = self.camera_combo.current()
+            device_index = self.available_cameras[selected]['index'] if 0 <= selected < len(self.available_cameras) else 0
+            return SourceFactory.create_source("webcam", device_index=device_index)
         elif source_type == "Video File":
             if not hasattr(self.source_button, 'path'):
                 raise ValueError("No video file selected")
@@ -254,67 +593,135 @@ class WebcamIPGUI:
                 raise ValueError("No image file selected")
             return SourceFactory.create_source("image", file_path=self.source_button.path)
     
+    def _prepare_source(self) -> "VideoSource":
+        """Create the selected source, open it once and apply the resolution"""
+        source = self.get_current_source()
+        if not source.is_opened() and not source.open():
+            raise ValueError("Could not open source")
+        source.set_resolution(*self._resolution)
+        return source
+    
+    def _on_resolution_changed(self) -> None:
+        """Parse the selected resolution once, when it changes"""
+        try:
+            self._resolution = tuple(int(x) for x in self.resolution_combo.get().split('x'))
+        except ValueError:
+            logging.warning("Invalid resolution: %s", self.resolution_combo.get())
+    
     def toggle_preview(self) -> None:
         """Toggle preview state"""
         if not self.preview_manager.is_active:
             try:
-                source = self.get_current_source()
+                source = self._prepare_source()
                 if self.preview_manager.start_preview(source):
                     self.preview_button.config(text="Stop Preview")
-                    self.update_preview()
             except Exception as e:
                 tk.messagebox.showerror("Error", str(e))
         else:
             self.preview_manager.stop_preview()
             self.preview_button.config(text="Start Preview")
     
-    def update_preview(self) -> None:
-        """Update preview frame"""
-        if self.preview_manager.is_active:
-            self.preview_manager.update_frame()
-            self.root.after(33, self.update_preview)  # ~30 FPS
-    
     def toggle_stream(self) -> None:
         """Toggle streaming state"""
         if not self.current_service or not self.current_service.is_running():
             try:
-                # Get video source
-                source = self.get_current_source()
-                if not source.is_opened() and not source.open():
-                    raise ValueError("Could not open source")
+                from streaming_service import StreamingServiceFactory, create_frame_encoder
                 
-                # Set resolution
-                width, height = map(int, self.resolution_combo.get().split('x'))
-                source.set_resolution(width, height)
+                protocol = self.protocol_var.get()
+                port = int(self.port_var.get())
                 
-                # Create frame generator
-                def frame_generator():
-                    while True:
-                        ret, frame = source.read_frame()
-                        if not ret:
-                            if isinstance(source, VideoSource):
-                                source.rewind()
+                # Get an opened video source at the selected resolution
+                source = self._prepare_source()
+                
+                # MJPEG over HTTP is always JPEG; WebSocket clients may opt into H.264
+                codec = self._websocket_codec if protocol == "WebSocket" else "jpeg"
+                encoder = create_frame_encoder(codec, self._jpeg_quality, self._stream_max_width)
+                
+                # Capture and encode once in a producer thread; every client
+                # reads the latest JPEG from a shared slot instead of re-encoding
+                stop_event = threading.Event()
+                self._latest_frame = (b'', threading.Event())
+                
+                # A webcam already sending MJPG can have its JPEGs forwarded as is,
+                # skipping decode and re-encode, when nothing needs the pixels
+                passthrough = (self._mjpeg_passthrough and codec == "jpeg" and not self._stream_max_width
+                               and hasattr(source, 'set_passthrough') and source.set_passthrough(True))
+                
+                def produce_frames():
+                    use_passthrough = passthrough
+                    try:
+                        while not stop_event.is_set():
+                            # Nothing is captured or encoded while no client is connected
+                            with self._clients_changed:
+                                while self._client_count == 0 and not stop_event.is_set():
+                                    self._clients_changed.wait(0.5)
+                            if stop_event.is_set():
+                                break
+                            
+                            started = time.monotonic()
+                            # Live sources drop stale buffered frames inside grab(),
+                            # so only the newest one is decoded
+                            if not source.grab():
+                                stop_event.wait(0.1)
                                 continue
-                            break
-                        ret, buffer = cv2.imencode('.jpg', frame)
-                        if ret:
-                            yield buffer.tobytes()
+                            buffer = None
+                            if use_passthrough:
+                                buffer = source.retrieve_encoded()
+                                if buffer is None:
+                                    logging.warning("Camera is not sending MJPEG; re-encoding frames")
+                                    source.set_passthrough(False)
+                                    use_passthrough = False
+                            else:
+                                ret, frame = source.retrieve()
+                                if ret:
+                                    buffer = encoder.encode(frame)
+                            if buffer is not None:
+                                # Publish a view of the encoded buffer (encoders allocate a
+                                # fresh one per frame, so no copy is needed), then wake
+                                # everyone waiting on the previous frame
+                                _, published = self._latest_frame
+                                self._latest_frame = (memoryview(buffer), threading.Event())
+                                published.set()
+                            
+                            # Sources that never block (e.g. static images) are capped at ~30 FPS
+                            stop_event.wait(max(0.0, STREAM_INTERVAL - (time.monotonic() - started)))
+                    except Exception as e:
+                        logging.error("Error in frame producer: %s", e)
+                    finally:
+                        source.release()
                 
-                # Create and start streaming service
-                protocol = self.protocol_combo.get()
-                port = int(self.port_entry.get())
+                def frame_generator():
+                    _, ready = self._latest_frame
+                    while not stop_event.is_set():
+                        if not ready.wait(timeout=0.5):
+                            continue
+                        frame, ready = self._latest_frame
+                        yield frame
                 
+                self._stream_stop = stop_event
+                self._client_count = 0
+                threading.Thread(target=produce_frames, daemon=True).start()
+                
+                # Create and start streaming service
                 # Stop any existing service
                 if self.current_service:
                     self.current_service.stop()
                     self.current_service = None
                 
-                # Create service
-                self.current_service = StreamingServiceFactory.create_service(
-                    protocol.lower(),
-                    host="0.0.0.0",
-                    port=port
-                )
+                # Reuse the last stopped service when protocol and port match,
+                # so its app and routes are not rebuilt on every start
+                idle_key, idle_service = self._idle_service
+                self._idle_service = (None, None)
+                if idle_key == (protocol, port):
+                    self.current_service = idle_service
+                else:
+                    self.current_service = StreamingServiceFactory.create_service(
+                        protocol.lower(),
+                        host="0.0.0.0",
+                        port=port
+                    )
+                self._service_key = (protocol, port)
+                self.current_service.on_clients_changed = self._on_clients_changed
                 
                 # Update UI before starting server
                 self.stream_button.config(text="Stop Server")
@@ -325,14 +732,14 @@ class WebcamIPGUI:
                 def run_service():
                     try:
                         if not self.current_service.start(frame_generator):
-                            source.release()
+                            self._stop_frame_producer()
                             self.current_service = None
                             tk.messagebox.showerror("Error", f"Could not start {protocol} server")
                             self.stream_button.config(text="Start Server")
                             self.lock_controls(False)
                     except Exception as e:
-                        logging.error(f"Error in streaming thread: {str(e)}")
-                        source.release()
+                        logging.error("Error in streaming thread: %s", e)
+                        self._stop_frame_producer()
                         if self.current_service:
                             self.current_service.stop()
                             self.current_service = None
@@ -343,8 +750,9 @@ class WebcamIPGUI:
                 self.server_thread.start()
                 
             except Exception as e:
-                logging.error(f"Error starting stream: {str(e)}")
+                logging.error("Error starting stream: %s", e)
                 tk.messagebox.showerror("Error", str(e))
+                self._stop_frame_producer()
                 if self.current_service:
                     self.current_service.stop()
                     self.current_service = None
@@ -360,16 +768,34 @@ class WebcamIPGUI:
             if self.current_service:
                 try:
                     self.current_service.stop()
+                    self._idle_service = (self._service_key, self.current_service)
                 except Exception as e:
-                    logging.error(f"Error stopping service: {str(e)}")
+                    logging.error("Error stopping service: %s", e)
                 finally:
                     self.current_service = None
+            self._stop_frame_producer()
+    
+    def _stop_frame_producer(self) -> None:
+        """Signal the capture/encode thread to exit; it releases the source"""
+        if self._stream_stop:
+            self._stream_stop.set()
+            self._stream_stop = None
+            # Wake a producer idling for clients so it exits now
+            with self._clients_changed:
+                self._clients_changed.notify_all()
+    
+    def _on_clients_changed(self, count: int) -> None:
+        """Track the service's client count; called from server threads"""
+        with self._clients_changed:
+            self._client_count = count
+            self._clients_changed.notify_all()
     
     def stop_streaming(self) -> None:
         """Stop streaming service"""
         if self.current_service:
             self.current_service.stop()
             self.current_service = None
+        self._stop_frame_producer()
         
         self.stream_button.config(text="Start Server")
         self.url_label.config(text="Stream URL: Not started")
@@ -377,133 +803,69 @@ class WebcamIPGUI:
     
     def lock_controls(self, locked: bool) -> None:
         """Lock or unlock controls when streaming"""
-        state = "disabled" if locked else "normal"
-        readonly_state = "disabled" if locked else "readonly"
-        
-        self.source_type_combo.config(state=readonly_state)
-        self.camera_combo.config(state=readonly_state)
-        self.source_button.config(state=state)
-        self.resolution_combo.config(state=readonly_state)
-        self.protocol_combo.config(state=readonly_state)
-        self.port_entry.config(state=state)
+        for widget, kind in self._lockable:
+            if locked:
+                state = "disabled"
+            else:
+                state = "readonly" if kind == 'ro' else "normal"
+            widget.tk.call(widget._w, 'configure', '-state', state)
     
     def update_url_label(self) -> None:
         """Update the URL label with current streaming information"""
-        protocol = self.protocol_combo.get()
+        protocol = self.protocol_var.get()
         ip = self.get_local_ip()
-        port = self.port_entry.get()
+        port = self.port_var.get()
         
-        if protocol == "HTTP":
-            url_text = f"Stream URL: http://{ip}:{port} (Clique para abrir)"
-        else:
-            url_text = f"Stream URL: ws://{ip}:{port} (Clique para abrir exemplo)"
-            self.create_websocket_example(ip, port)
+        key = (protocol, ip, port)
+        url_text = self._url_cache.get(key)
+        if url_text is None:
+            if protocol == "HTTP":
+                url_text = f"Stream URL: http://{ip}:{port} (Clique para abrir)"
+            else:
+                url_text = f"Stream URL: ws://{ip}:{port} (Clique para abrir exemplo)"
+                self.create_websocket_example(ip, port)
+            self._url_cache[key] = url_text
         
         self.url_label.config(text=url_text, foreground="blue", cursor="hand2")
     
     def create_websocket_example(self, ip: str, port: str) -> None:
         """Create WebSocket example client"""
-        example_html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>WebSocket Camera Stream</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            margin: 20px;
-            background-color: #f0f0f0;
-        }}
-        h2 {{
-            color: #333;
-        }}
-        #videoCanvas {{
-            border: 2px solid #333;
-            background-color: #fff;
-            max-width: 100%;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 20px;
-        }}
-        .status {{
-            margin-top: 10px;
-            color: #666;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h2>Camera Stream</h2>
-        <canvas id="videoCanvas"></canvas>
-        <div class="status" id="status">Conectando...</div>
-    </div>
-    <script>
-        const canvas = document.getElementById('videoCanvas');
-        const ctx = canvas.getContext('2d');
-        const status = document.getElementById('status');
-        let ws = null;
+        if self._ws_example_written == (ip, port) and os.path.exists(_WS_EXAMPLE_PATH):
+            return
         
-        function connect() {{
-            ws = new WebSocket('ws://{ip}:{port}');
-            
-            ws.onopen = function() {{
-                status.textContent = 'Conectado';
-                status.style.color = 'green';
-            }};
-            
-            ws.onmessage = function(event) {{
-                const reader = new FileReader();
-                reader.onload = function() {{
-                    const img = new Image();
-                    img.onload = function() {{
-                        canvas.width = img.width;
-                        canvas.height = img.height;
-                        ctx.drawImage(img, 0, 0);
-                    }};
-                    img.src = reader.result;
-                }};
-                reader.readAsDataURL(event.data);
-            }};
-            
-            ws.onclose = function() {{
-                status.textContent = 'Desconectado - Tentando reconectar...';
-                status.style.color = 'red';
-                setTimeout(connect, 3000);
-            }};
-            
-            ws.onerror = function(err) {{
-                status.textContent = 'Erro na conexão';
-                status.style.color = 'red';
-            }};
-        }}
+        content = WS_EXAMPLE_TEMPLATE.format(ip=ip, port=port)
+        path = _WS_EXAMPLE_PATH
         
-        connect();
-    </script>
-</body>
-</html>
-"""
-        os.makedirs('client-html-example', exist_ok=True)
-        with open('client-html-example/index.html', 'w', encoding='utf-8') as f:
-            f.write(example_html)
+        # Skip the write when the file on disk already matches
+        try:
+            if os.path.getsize(path) == len(content.encode('utf-8')):
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    if f.read() == content:
+                        self._ws_example_written = (ip, port)
+                        return
+        except OSError:
+            pass
+        
+        os.makedirs(_WS_EXAMPLE_DIR, exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        self._ws_example_written = (ip, port)
     
     def open_stream_url(self, event=None) -> None:
         """Open the stream URL in browser"""
         if not self.current_service or not self.current_service.is_running():
             return
             
-        protocol = self.protocol_combo.get()
+        protocol = self.protocol_var.get()
         ip = self.get_local_ip()
-        port = self.port_entry.get()
+        port = self.port_var.get()
         
+        import webbrowser
         if protocol == "HTTP":
             webbrowser.open(f"http://{ip}:{port}")
         else:
-            example_path = os.path.join(os.path.dirname(__file__), 'client-html-example', 'index.html')
-            if os.path.exists(example_path):
-                webbrowser.open(f"file://{example_path}")
+            if os.path.exists(_WS_EXAMPLE_PATH):
+                webbrowser.open(f"file://{_WS_EXAMPLE_PATH}")
             else:
                 tk.messagebox.showwarning(
                     "Cliente WebSocket",
@@ -512,34 +874,59 @@ class WebcamIPGUI:
                 )
     
     def get_local_ip(self) -> str:
-        """Get local IP address"""
-        try:
-            import socket
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-            s.close()
-            return ip
-        except:
-            return "127.0.0.1" 
+        """Get local IP address, cached after the first lookup"""
+        return _detect_local_ip()
+    
+    def _invalidate_ip_cache(self, event=None) -> None:
+        """Forget the cached IP address and refresh the status labels"""
+        _detect_local_ip.cache_clear()
+        self.ip_label.config(text=f"Local IP: {self.get_local_ip()}")
+        if self.current_service and self.current_service.is_running():
+            self.update_url_label()
     
     def setup_auto_save(self) -> None:
         """Setup auto-save triggers for settings"""
         # Bind to ComboboxSelected event
-        self.source_type_combo.bind('<<ComboboxSelected>>', lambda e: (self.on_source_type_changed(), self.save_settings()))
-        self.camera_combo.bind('<<ComboboxSelected>>', lambda e: self.save_settings())
-        self.resolution_combo.bind('<<ComboboxSelected>>', lambda e: self.save_settings())
-        self.protocol_combo.bind('<<ComboboxSelected>>', lambda e: self.save_settings())
+        self.source_type_combo.bind('<<ComboboxSelected>>', lambda e: (self.on_source_type_changed(), self._schedule_save()))
+        self.camera_combo.bind('<<ComboboxSelected>>', lambda e: self._schedule_save(), add='+')
+        self.resolution_combo.bind('<<ComboboxSelected>>', lambda e: (self._on_resolution_changed(), self._schedule_save()), add='+')
+        self.protocol_combo.bind('<<ComboboxSelected>>', lambda e: self._schedule_save(), add='+')
         
         # Bind to key events for port entry
-        self.port_entry.bind('<FocusOut>', lambda e: self.save_settings())
-        self.port_entry.bind('<Return>', lambda e: self.save_settings())
+        self.port_entry.bind('<FocusOut>', lambda e: self._schedule_save(), add='+')
+        self.port_entry.bind('<Return>', lambda e: self._schedule_save(), add='+')
+        
+        # Pause the preview while the window is minimized
+        self.root.bind('<Unmap>', self._on_window_visibility, add='+')
+        self.root.bind('<Map>', self._on_window_visibility, add='+')
+        
+        # Hidden hotkey to refresh the network address
+        self.root.bind('<F5>', self._invalidate_ip_cache)
         
         # Save settings when window is closed
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
     
+    def _on_window_visibility(self, event) -> None:
+        """Track whether the main window is shown; child widgets also report here"""
+        if event.widget is self.root:
+            self.preview_manager.set_visible(event.type == tk.EventType.Map)
+    
+    def _schedule_save(self) -> None:
+        """Coalesce bursts of changes into one save after a short delay"""
+        if self._save_after_id:
+            self.root.after_cancel(self._save_after_id)
+        self._save_after_id = self.root.after(SAVE_DEBOUNCE_MS, self._do_save)
+    
+    def _do_save(self) -> None:
+        """Run the pending debounced save"""
+        self._save_after_id = None
+        self.save_settings()
+    
     def on_closing(self) -> None:
         """Handle window closing event"""
+        if self._save_after_id:
+            self.root.after_cancel(self._save_after_id)
+            self._save_after_id = None
         self.save_settings()
         self.root.destroy()
     
@@ -549,16 +936,26 @@ class WebcamIPGUI:
             settings = self.config_manager.load_settings()
             logging.info("Loading settings: %s", settings)
             
+            # Encoder settings have no widgets; they are only edited in the config file
+            try:
+                # Hand-edited values are clamped to what the encoders accept
+                self._jpeg_quality = min(100, max(1, int(settings.get('jpeg_quality', JPEG_QUALITY))))
+                self._stream_max_width = max(0, int(settings.get('stream_max_width', STREAM_MAX_WIDTH)))
+                self._websocket_codec = str(settings.get('websocket_codec', "jpeg")).lower()
+                self._mjpeg_passthrough = _parse_bool(settings.get('mjpeg_passthrough', False))
+            except (TypeError, ValueError) as e:
+                logging.error("Invalid encoder settings: %s", e)
+            
             # Apply settings in correct order
             if settings.get('resolution'):
                 self.resolution_combo.set(settings['resolution'])
+                self._on_resolution_changed()
             
             if settings.get('protocol'):
-                self.protocol_combo.set(settings['protocol'])
+                self.protocol_var.set(settings['protocol'])
             
             if settings.get('port'):
-                self.port_entry.delete(0, tk.END)
-                self.port_entry.insert(0, settings['port'])
+                self.port_var.set(settings['port'])
             
             # Load source type and related settings last
             if settings.get('source_type'):
@@ -570,7 +967,7 @@ class WebcamIPGUI:
                     selected_camera = settings['selected_camera']
                     if 0 <= selected_camera < len(self.camera_combo['values']):
                         self.camera_combo.current(selected_camera)
-                        logging.info(f"Restored selected camera index: {selected_camera}")
+                        logging.info("Restored selected camera index: %s", selected_camera)
                 
                 # Load file paths if they exist
                 if settings.get('last_video_path') and os.path.exists(settings['last_video_path']):
@@ -582,7 +979,7 @@ class WebcamIPGUI:
                     self.source_button.configure(text=os.path.basename(settings['last_image_path']))
                 
         except Exception as e:
-            logging.error(f"Error loading settings: {str(e)}")
+            logging.error("Error loading settings: %s", e)
     
     def save_settings(self, event=None) -> None:
         """Save current settings"""
@@ -590,15 +987,19 @@ class WebcamIPGUI:
             # Get current values from GUI
             source_type = self.source_type_combo.get()
             resolution = self.resolution_combo.get()
-            protocol = self.protocol_combo.get()
-            port = self.port_entry.get()
+            protocol = self.protocol_var.get()
+            port = self.port_var.get()
             
             # Create settings dictionary
             settings = {
                 'source_type': source_type,
                 'resolution': resolution,
                 'protocol': protocol,
-                'port': port
+                'port': port,
+                'jpeg_quality': self._jpeg_quality,
+                'stream_max_width': self._stream_max_width,
+                'websocket_codec': self._websocket_codec,
+                'mjpeg_passthrough': self._mjpeg_passthrough
             }
             
             # Save selected camera index if in webcam mode
@@ -606,7 +1007,7 @@ class WebcamIPGUI:
                 current_index = self.camera_combo.current()
                 if current_index >= 0:
                     settings['selected_camera'] = current_index
-                    logging.info(f"Saving selected camera index: {current_index}")
+                    logging.info("Saving selected camera index: %s", current_index)
             
             # Add file paths if they exist
             if hasattr(self.source_button, 'path'):
@@ -617,17 +1018,22 @@ class WebcamIPGUI:
             
             # Log current settings before saving
             logging.info("Current GUI state:")
-            logging.info(f"  Source Type: {source_type}")
-            logging.info(f"  Resolution: {resolution}")
-            logging.info(f"  Protocol: {protocol}")
-            logging.info(f"  Port: {port}")
+            logging.info("  Source Type: %s", source_type)
+            logging.info("  Resolution: %s", resolution)
+            logging.info("  Protocol: %s", protocol)
+            logging.info("  Port: %s", port)
+            
+            # Nothing changed since the last write
+            if settings == self._last_saved_settings:
+                return
             
             # Save settings
             if self.config_manager.save_settings(settings):
+                self._last_saved_settings = settings
                 logging.info("Settings saved successfully")
             else:
                 logging.error("Failed to save settings")
             
         except Exception as e:
-            logging.error(f"Error in save_settings: {str(e)}")
+            logging.error("Error in save_settings: %s", e)
             tk.messagebox.showerror("Error", f"Could not save settings: {str(e)}") 
\ No newline at end of file
@@ -4,11 +4,48 @@ import logging
 from typing import Tuple, Optional, List, Dict, Union
 import time
 import subprocess
-import threading
+from concurrent.futures import ThreadPoolExecutor
+import os
+import json
+import sys
+import functools
+
+try:
+    import av
+except ImportError:
+    av = None
+
+_PLATFORM = sys.platform
+
+# Capture backend matching the platform's native camera API
+if _PLATFORM == "win32":
+    CAMERA_BACKEND = cv2.CAP_DSHOW
+elif _PLATFORM == "darwin":
+    CAMERA_BACKEND = cv2.CAP_AVFOUNDATION
+else:
+    CAMERA_BACKEND = cv2.CAP_ANY
+
+@functools.lru_cache(maxsize=1)
+def _raise_timer_resolution() -> None:
+    """Drop the Windows timer period to 1 ms so frame pacing sleeps are accurate"""
+    # Python 3.11+ already sleeps on a high-resolution timer
+    if _PLATFORM != "win32" or sys.version_info >= (3, 11):
+        return
+    try:
+        import ctypes
+        ctypes.WinDLL('winmm').timeBeginPeriod(1)
+    except Exception as e:
+        logging.debug("Could not raise timer resolution: %s", e)
+
+# Camera grabs faster than this were already buffered; drop at most this many per read
+STALE_GRAB_SECONDS = 0.001
+STALE_GRAB_LIMIT = 5
 
 class VideoSource(ABC):
     """Abstract base class for video sources"""
     
+    __slots__ = ('_grabbed',)
+    
     @abstractmethod
     def open(self) -> bool:
         """Open the video source"""
@@ -19,6 +56,17 @@ class VideoSource(ABC):
         """Read a frame from the source"""
         pass
     
+    def grab(self) -> bool:
+        """Advance to the next frame; sources without a cheap grab read it here"""
+        self._grabbed = self.read_frame()
+        return self._grabbed[0]
+    
+    def retrieve(self) -> Tuple[bool, Optional[cv2.Mat]]:
+        """Return the frame taken by the last grab()"""
+        grabbed = getattr(self, '_grabbed', (False, None))
+        self._grabbed = (False, None)
+        return grabbed
+    
     @abstractmethod
     def set_resolution(self, width: int, height: int) -> None:
         """Set the resolution of the source"""
@@ -33,93 +81,272 @@ class VideoSource(ABC):
     def is_opened(self) -> bool:
         """Check if source is opened"""
         pass
+    
+    def is_healthy(self) -> bool:
+        """Probe the underlying device; slower than is_opened()"""
+        return self.is_opened()
+
+class _CaptureBackedSource(VideoSource):
+    """Shared plumbing for sources read through a cv2.VideoCapture"""
+    
+    __slots__ = ('capture', '_opened', '_frame_bufs', '_frame_buf_idx')
+    
+    def __init__(self):
+        self.capture = None
+        self._opened = False
+        self._frame_bufs = [None, None]
+        self._frame_buf_idx = 0
+    
+    def _decode_into(self, decode) -> Tuple[bool, Optional[cv2.Mat]]:
+        """Decode via decode(dst) into one of two reused buffers in turn"""
+        # A returned frame stays valid until the read after next, which covers
+        # a consumer still drawing the previous frame from another thread
+        self._frame_buf_idx ^= 1
+        ret, frame = decode(self._frame_bufs[self._frame_buf_idx])
+        if ret:
+            self._frame_bufs[self._frame_buf_idx] = frame
+        return ret, frame
+    
+    def set_resolution(self, width: int, height: int) -> None:
+        if self.is_opened():
+            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    
+    def release(self) -> None:
+        if self.capture:
+            try:
+                self.capture.release()
+            except Exception as e:
+                logging.error("Error releasing video capture: %s", e)
+            finally:
+                self._opened = False
+                self.capture = None
+    
+    def is_opened(self) -> bool:
+        # Only open()/release() change this, so skip the per-frame isOpened() call
+        return self._opened
+    
+    def is_healthy(self) -> bool:
+        return self.capture is not None and self.capture.isOpened()
 
-class WebcamSource(VideoSource):
+class WebcamSource(_CaptureBackedSource):
+    __slots__ = ('device_index', 'dropped_frames')
+    
     def __init__(self, device_index: int):
+        super().__init__()
         self.device_index = device_index
-        self.capture = None
+        self.dropped_frames = 0
         
     def open(self) -> bool:
         try:
-            self.capture = cv2.VideoCapture(self.device_index, cv2.CAP_DSHOW)
-            return self.capture.isOpened()
+            self.capture = cv2.VideoCapture(self.device_index, CAMERA_BACKEND)
+            if not self.capture.isOpened():
+                return False
+            
+            # Ask for compressed MJPG so the camera, not the CPU, handles YUY2 bandwidth
+            self.capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            self.capture.set(cv2.CAP_PROP_FPS, 30)
+            # Keep the driver queue short; backends that ignore this are drained in grab()
+            self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            self._opened = True
+            return True
         except Exception as e:
-            logging.error(f"Error opening webcam: {str(e)}")
+            logging.error("Error opening webcam: %s", e)
             return False
     
     def read_frame(self) -> Tuple[bool, Optional[cv2.Mat]]:
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+    
+    def grab(self) -> bool:
+        """Grab the newest frame, dropping any the driver had already queued"""
+        if not self.is_opened():
+            return False
+        
+        # A grab that returns at once came from the driver's queue, not the
+        # sensor; keep grabbing (no decode) until one waits for a fresh frame
+        grabbed_at = time.perf_counter()
+        if not self.capture.grab():
+            return False
+        for _ in range(STALE_GRAB_LIMIT):
+            if time.perf_counter() - grabbed_at >= STALE_GRAB_SECONDS:
+                break
+            grabbed_at = time.perf_counter()
+            if not self.capture.grab():
+                break
+            self.dropped_frames += 1
+        return True
+    
+    def retrieve(self) -> Tuple[bool, Optional[cv2.Mat]]:
         if not self.is_opened():
             return False, None
-        return self.capture.read()
+        return self._decode_into(self.capture.retrieve)
     
-    def set_resolution(self, width: int, height: int) -> None:
-        if self.is_opened():
-            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    def set_passthrough(self, enabled: bool) -> bool:
+        """Switch retrieve_encoded() on or off; off restores decoded BGR frames"""
+        if not self.is_opened():
+            return False
+        # With conversion off, backends that negotiated MJPG hand over the camera's own JPEG
+        return self.capture.set(cv2.CAP_PROP_CONVERT_RGB, 0 if enabled else 1)
     
-    def release(self) -> None:
-        if self.capture:
-            self.capture.release()
-            self.capture = None
+    def retrieve_encoded(self):
+        """Return the grabbed frame as the camera's JPEG bytes, or None if it is not JPEG"""
+        ret, raw = self.capture.retrieve()
+        # A decoded frame has colour channels; passed-through bytes come as one row
+        if not ret or raw is None or raw.ndim == 3:
+            return None
+        data = raw.reshape(-1)
+        # Only a JPEG start-of-image marker proves the backend passed the bytes through
+        if data.size < 2 or data[0] != 0xFF or data[1] != 0xD8:
+            return None
+        return data
     
-    def is_opened(self) -> bool:
-        return self.capture is not None and self.capture.isOpened()
+    def release(self) -> None:
+        if self.capture and self.dropped_frames:
+            logging.info("Webcam %s: dropped %s stale frames", self.device_index, self.dropped_frames)
+        super().release()
 
-class VideoFileSource(VideoSource):
+class VideoFileSource(_CaptureBackedSource):
+    __slots__ = ('file_path', '_decode_buf', '_target_size', 'fps', 'frame_delay',
+                 '_next_deadline', 'max_retries', 'retry_delay')
+    
+    # Whether this OpenCV build opens files with hardware decode options; learned
+    # on the first open so reopening to loop a video does not probe again
+    _hw_open_supported: Optional[bool] = None
+    
     def __init__(self, file_path: str):
+        super().__init__()
         self.file_path = file_path
-        self.capture = None
+        self._decode_buf = None
+        self._target_size: Optional[Tuple[int, int]] = None
         self.fps = 30
         self.frame_delay = 1.0 / self.fps
-        self.last_frame_time = 0
-        self._lock = threading.Lock()
+        self._next_deadline: Optional[float] = None
         self.max_retries = 3
         self.retry_delay = 1.0  # segundos
-        logging.info(f"VideoFileSource initialized for {file_path}")
+        logging.info("VideoFileSource initialized for %s", file_path)
         
     def open(self) -> bool:
         try:
-            logging.info(f"Opening video file: {self.file_path}")
-            self.capture = cv2.VideoCapture(self.file_path)
+            logging.info("Opening video file: %s", self.file_path)
+            self.capture = self._open_capture()
             if self.capture.isOpened():
                 self.fps = self.capture.get(cv2.CAP_PROP_FPS)
                 if self.fps <= 0:
                     self.fps = 30
                 self.frame_delay = 1.0 / self.fps
-                logging.info(f"Video file opened successfully. FPS: {self.fps}")
+                self._next_deadline = None
+                self._opened = True
+                logging.info("Video file opened successfully. FPS: %s", self.fps)
                 return True
             logging.error("Failed to open video file")
             return False
         except Exception as e:
-            logging.error(f"Error opening video file: {str(e)}")
+            logging.error("Error opening video file: %s", e)
             return False
     
+    def _open_capture(self) -> cv2.VideoCapture:
+        """Open the file with hardware decoding if available, else the default decoder"""
+        try_hw = VideoFileSource._hw_open_supported is not False and hasattr(cv2, 'CAP_PROP_HW_ACCELERATION')
+        if try_hw:
+            try:
+                # No CAP_PROP_HW_DEVICE: OpenCV rejects a device index together with 'ANY'
+                capture = cv2.VideoCapture(self.file_path, cv2.CAP_FFMPEG, [
+                    cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY
+                ])
+                if capture.isOpened():
+                    # 'ANY' falls back to software inside FFmpeg; the property says which won
+                    acceleration = int(capture.get(cv2.CAP_PROP_HW_ACCELERATION))
+                    if acceleration != cv2.VIDEO_ACCELERATION_NONE:
+                        logging.info("Video decode: hardware (acceleration type %s)", acceleration)
+                    else:
+                        logging.info("Video decode: software (no hardware decoder for this file)")
+                    VideoFileSource._hw_open_supported = True
+                    return capture
+                capture.release()
+            except Exception as e:
+                logging.debug("Hardware decode unavailable: %s", e)
+        capture = cv2.VideoCapture(self.file_path)
+        if try_hw and capture.isOpened():
+            # The file itself opens, so it was the hardware options that failed
+            VideoFileSource._hw_open_supported = False
+        logging.info("Video decode: software")
+        return capture
+    
+    def _skip_frame(self) -> bool:
+        """Advance one frame without converting it"""
+        return self.capture.grab()
+    
+    def _read_next(self) -> Tuple[bool, Optional[cv2.Mat]]:
+        """Decode the next frame"""
+        if self._target_size is None:
+            return self._decode_into(self.capture.read)
+        
+        # Full-size decodes land in one scratch buffer; only the shrunk copy is handed out
+        ret, frame = self.capture.read(self._decode_buf)
+        if not ret:
+            return False, None
+        self._decode_buf = frame
+        return self._decode_into(lambda dst: (True, cv2.resize(
+            frame, self._target_size, dst=dst, interpolation=cv2.INTER_AREA)))
+    
+    def _native_size(self) -> Tuple[int, int]:
+        """Frame size the decoder produces"""
+        return (int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    
+    def _rewind(self) -> None:
+        """Start again from the first frame"""
+        # Reopening is cheap with the file in the page cache and, unlike a
+        # CAP_PROP_POS_FRAMES seek, always restarts decoding on a keyframe
+        self.capture.release()
+        self.capture = self._open_capture()
+        self._opened = self.capture.isOpened()
+    
     def read_frame(self) -> Tuple[bool, Optional[cv2.Mat]]:
         if not self.is_opened():
             logging.warning("Attempted to read frame from closed video source")
             return False, None
+        
+        # Windows' default 15.6 ms tick would make the pacing sleep below overshoot
+        _raise_timer_resolution()
+        
+        # Preview and stream each open their own source, so only one thread ever
+        # reads this capture and no lock is needed around it
+        try:
+            # Pace against a monotonic deadline that advances by whole frame
+            # periods, so a slow frame is made up instead of delaying the rest
+            now = time.monotonic()
+            if self._next_deadline is None:
+                self._next_deadline = now
+            behind = now - self._next_deadline
             
-        with self._lock:  # Protege o acesso ao capture
-            try:
-                current_time = time.time()
-                elapsed = current_time - self.last_frame_time
-                
-                if elapsed < self.frame_delay:
-                    time.sleep(self.frame_delay - elapsed)
+            if behind < 0:
+                time.sleep(-behind)
+            elif behind >= self.frame_delay:
+                # Advance past the frames we would have shown without decoding
+                # them; after a long stall (over a second) just resync instead
+                n_skip = int(behind / self.frame_delay)
+                if n_skip <= self.fps:
+                    for _ in range(n_skip):
+                        if not self._skip_frame():
+                            break
+                self._next_deadline = now
+            
+            ret, frame = self._read_next()
+            if not ret:
+                logging.info("End of video reached, rewinding")
+                self._rewind()
+                ret, frame = self._read_next()
                 
-                ret, frame = self.capture.read()
-                if not ret:
-                    logging.info("End of video reached, rewinding")
-                    self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    ret, frame = self.capture.read()
-                    
-                self.last_frame_time = time.time()
-                if ret:
-                    logging.debug(f"Frame read successfully. Frame time: {self.last_frame_time}")
-                return ret, frame
-            except Exception as e:
-                logging.error(f"Error reading frame: {str(e)}")
-                return False, None
+            self._next_deadline += self.frame_delay
+            if ret:
+                logging.debug("Frame read successfully. Next deadline: %s", self._next_deadline)
+            return ret, frame
+        except Exception as e:
+            logging.error("Error reading frame: %s", e)
+            return False, None
     
     def _handle_ffmpeg_error(self, error: Exception) -> bool:
         """Handle FFmpeg specific errors with retry mechanism"""
@@ -127,26 +354,28 @@ class VideoFileSource(VideoSource):
         
         # Identifica erros específicos do FFmpeg
         if "ffmpeg" in error_str or "avcodec" in error_str:
-            logging.warning(f"FFmpeg error detected: {error_str}")
+            logging.warning("FFmpeg error detected: %s", error_str)
             
             # Tenta reabrir o vídeo
             for attempt in range(self.max_retries):
                 try:
-                    logging.info(f"Attempting to recover from FFmpeg error (attempt {attempt + 1}/{self.max_retries})")
+                    logging.info("Attempting to recover from FFmpeg error (attempt %s/%s)", attempt + 1, self.max_retries)
                     time.sleep(self.retry_delay)
                     
                     # Libera recursos atuais
+                    self._opened = False
                     if self.capture:
                         self.capture.release()
                     
                     # Tenta reabrir
-                    self.capture = cv2.VideoCapture(self.file_path)
+                    self.capture = self._open_capture()
                     if self.capture.isOpened():
+                        self._opened = True
                         logging.info("Successfully recovered from FFmpeg error")
                         return True
                     
                 except Exception as retry_error:
-                    logging.error(f"Error during recovery attempt {attempt + 1}: {str(retry_error)}")
+                    logging.error("Error during recovery attempt %s: %s", attempt + 1, retry_error)
             
             logging.error("Failed to recover from FFmpeg error after all attempts")
             return False
@@ -163,43 +392,129 @@ class VideoFileSource(VideoSource):
             return False, None
     
     def set_resolution(self, width: int, height: int) -> None:
-        # Video files maintain their original resolution
-        logging.info(f"Resolution set to {width}x{height} (ignored for video files)")
+        # Video files are only ever shrunk, so no pixels are invented
+        if not self.is_opened():
+            return
+        native_width, native_height = self._native_size()
+        # Fit inside the requested box with one scale factor, keeping the aspect ratio
+        scale = min(width / native_width, height / native_height) if native_width and native_height else 1.0
+        if scale < 1.0:
+            # Round to even sizes, which video encoders downstream expect
+            target_width = max(2, round(native_width * scale / 2) * 2)
+            target_height = max(2, round(native_height * scale / 2) * 2)
+            self._target_size = (target_width, target_height)
+            logging.info("Video frames scaled from %sx%s to %sx%s",
+                         native_width, native_height, target_width, target_height)
+        else:
+            self._target_size = None
+            logging.info("Video frames kept at native %sx%s", native_width, native_height)
     
     def release(self) -> None:
         if self.capture:
             logging.info("Releasing video capture")
+        super().release()
+
+class VideoFileSourceAV(VideoFileSource):
+    """Video file source decoded with PyAV instead of OpenCV"""
+    
+    __slots__ = ('container', '_stream', '_frames')
+    
+    def __init__(self, file_path: str):
+        super().__init__(file_path)
+        self.container = None
+        self._stream = None
+        self._frames = None
+    
+    def open(self) -> bool:
+        try:
+            logging.info("Opening video file with PyAV: %s", self.file_path)
+            self.container = av.open(self.file_path)
+            self._stream = self.container.streams.video[0]
+            # Frame- and slice-threaded decode across all cores
+            self._stream.thread_type = 'AUTO'
+            self.fps = float(self._stream.average_rate or 0) or 30
+            self.frame_delay = 1.0 / self.fps
+            self._next_deadline = None
+            self._frames = self.container.decode(self._stream)
+            logging.info("Video file opened successfully. FPS: %s", self.fps)
+            return True
+        except Exception as e:
+            logging.error("Error opening video file: %s", e)
+            self.release()
+            return False
+    
+    def _skip_frame(self) -> bool:
+        # Decoded but never converted to BGR
+        return next(self._frames, None) is not None
+    
+    def _read_next(self) -> Tuple[bool, Optional[cv2.Mat]]:
+        frame = next(self._frames, None)
+        if frame is None:
+            return False, None
+        if self._target_size is None:
+            return True, frame.to_ndarray(format='bgr24')
+        # libswscale scales and converts to BGR in one pass
+        width, height = self._target_size
+        return True, frame.to_ndarray(format='bgr24', width=width, height=height)
+    
+    def _native_size(self) -> Tuple[int, int]:
+        return self._stream.codec_context.width, self._stream.codec_context.height
+    
+    def _rewind(self) -> None:
+        # A real seek to the first keyframe; a fresh decode iterator follows it
+        self.container.seek(0)
+        self._frames = self.container.decode(self._stream)
+    
+    def release(self) -> None:
+        if self.container:
+            logging.info("Releasing video container")
             try:
-                self.capture.release()
+                self.container.close()
             except Exception as e:
-                logging.error(f"Error releasing video capture: {str(e)}")
+                logging.error("Error releasing video container: %s", e)
             finally:
-                self.capture = None
+                self.container = None
+                self._stream = None
+                self._frames = None
     
     def is_opened(self) -> bool:
-        return self.capture is not None and self.capture.isOpened()
+        return self.container is not None
+    
+    def is_healthy(self) -> bool:
+        return self.is_opened()
 
 class ImageSource(VideoSource):
-    def __init__(self, file_path: str):
+    __slots__ = ('file_path', 'image', 'copy_on_read')
+    
+    def __init__(self, file_path: str, copy_on_read: bool = False):
         self.file_path = file_path
         self.image = None
+        self.copy_on_read = copy_on_read
         
     def open(self) -> bool:
         try:
             self.image = cv2.imread(self.file_path)
             return self.image is not None
         except Exception as e:
-            logging.error(f"Error opening image file: {str(e)}")
+            logging.error("Error opening image file: %s", e)
             return False
     
     def read_frame(self) -> Tuple[bool, Optional[cv2.Mat]]:
         if not self.is_opened():
             return False, None
-        return True, self.image.copy()
+        if self.copy_on_read:
+            return True, self.image.copy()
+        # Read-only view: consumers only resize/encode, so skip the per-frame copy
+        view = self.image.view()
+        view.flags.writeable = False
+        return True, view
     
     def set_resolution(self, width: int, height: int) -> None:
         if self.is_opened():
-            self.image = cv2.resize(self.image, (width, height))
+            # INTER_AREA when shrinking, INTER_LINEAR when enlarging
+            current_height, current_width = self.image.shape[:2]
+            interpolation = cv2.INTER_AREA if width * height < current_width * current_height else cv2.INTER_LINEAR
+            self.image = cv2.resize(self.image, (width, height), interpolation=interpolation)
     
     def release(self) -> None:
         self.image = None
@@ -210,91 +525,231 @@ class ImageSource(VideoSource):
 class SourceFactory:
     """Factory class for creating video sources"""
     
+    # Last camera enumeration as (time.monotonic(), cameras)
+    _cache: Optional[Tuple[float, List[Dict[str, Union[int, str]]]]] = None
+    _cache_ttl = 30.0
+    _executor: Optional[ThreadPoolExecutor] = None
+    
     @staticmethod
     def create_source(source_type: str, **kwargs) -> VideoSource:
         """Create a video source based on type"""
         if source_type == "webcam":
             return WebcamSource(**kwargs)
         elif source_type == "video":
+            # PyAV decodes with FFmpeg's own threading when it is installed
+            if av is not None:
+                return VideoFileSourceAV(**kwargs)
             return VideoFileSource(**kwargs)
         elif source_type == "image":
             return ImageSource(**kwargs)
         else:
             raise ValueError(f"Unknown source type: {source_type}")
     
-    @staticmethod
-    def get_available_cameras() -> List[Dict[str, Union[int, str]]]:
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        """Shared pool for the DirectShow device probes"""
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="camera-probe")
+        return cls._executor
+    
+    @classmethod
+    def get_available_cameras(cls) -> List[Dict[str, Union[int, str]]]:
         """Get list of available cameras"""
+        cached = cls._cache
+        if cached and time.monotonic() - cached[0] < cls._cache_ttl:
+            return list(cached[1])
+        
         cameras = []
         try:
-            # Get camera names using PowerShell
-            cmd = '''
-            Get-PnpDevice -Class 'Image' -Status 'OK' | 
-            Where-Object { $_.FriendlyName -match 'camera|webcam|ivCam' } | 
-            Select-Object FriendlyName |
-            Format-List
-            '''
-            result = subprocess.run(['powershell', '-Command', cmd], capture_output=True, text=True)
-            
-            # Parse PowerShell output to get camera names
-            camera_names = []
-            for line in result.stdout.split('\n'):
-                line = line.strip()
-                if line.startswith('FriendlyName'):
-                    name = line.split(':', 1)[1].strip()
-                    if name and not name.lower().startswith('microsoft'):  # Filter out virtual cameras
-                        camera_names.append(name)
-            
-            logging.info(f"Found camera names from Windows: {camera_names}")
-            
-            # Try each index for real cameras
-            test_indices = [0, 1, 2]  # Test first 3 indices
-            found_cameras = []  # Temporary list to store found cameras
-            
-            for idx in test_indices:
-                try:
-                    cap = cv2.VideoCapture(idx, cv2.CAP_DSHOW)
-                    if cap.isOpened():
-                        # Read one frame to ensure camera is working
-                        ret, _ = cap.read()
-                        if ret:
-                            # Get camera properties
-                            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                            
-                            # Store camera info with index
-                            found_cameras.append({
-                                "index": idx,
-                                "width": width,
-                                "height": height
-                            })
-                            
-                            # Log successful camera detection
-                            logging.info(f"Successfully opened camera at index {idx}")
-                        
-                        cap.release()
-                    
-                except Exception as e:
-                    logging.debug(f"Error checking camera {idx}: {str(e)}")
-                    continue
-            
-            # Match found cameras with names in correct order
-            for i, name in enumerate(camera_names):
-                if i < len(found_cameras):
-                    camera_info = found_cameras[i]
-                    name = f"{name} ({camera_info['width']}x{camera_info['height']})"
-                    cameras.append({"index": camera_info['index'], "name": name})
-            
-            logging.info(f"Found cameras at indices: {[c['index'] for c in cameras]}")
-        
+            cameras = SourceFactory._enumerate_cameras()
+            logging.info("Found cameras at indices: %s", [c['index'] for c in cameras])
         except Exception as e:
-            logging.error(f"Error enumerating cameras: {str(e)}")
+            logging.error("Error enumerating cameras: %s", e)
         
         if not cameras:
-            # If no cameras were found, add a dummy entry
-            cameras.append({"index": 0, "name": "No cameras found"})
+            # An empty list lets callers tell "no cameras" apart from a real result
             logging.warning("No cameras were detected")
         else:
-            logging.info(f"Final camera list: {[c['name'] for c in cameras]}")
+            logging.info("Final camera list: %s", [c['name'] for c in cameras])
+            cls._cache = (time.monotonic(), cameras)
+        
+        return list(cameras)
+    
+    @staticmethod
+    def _enumerate_cameras() -> List[Dict[str, Union[int, str]]]:
+        """Enumerate cameras using the platform's cheapest mechanism"""
+        if _PLATFORM == "win32":
+            return SourceFactory._enumerate_windows_cameras()
+        elif _PLATFORM == "darwin":
+            return SourceFactory._enumerate_macos_cameras()
+        return SourceFactory._enumerate_linux_cameras()
+    
+    @staticmethod
+    def _enumerate_linux_cameras() -> List[Dict[str, Union[int, str]]]:
+        """List V4L2 capture devices from /dev without opening them"""
+        cameras = []
+        for entry in os.scandir('/dev'):
+            suffix = entry.name[len('video'):]
+            if not entry.name.startswith('video') or not suffix.isdigit():
+                continue
+            
+            # Skip metadata nodes; only the first node of each device captures
+            sysfs_dir = os.path.join('/sys/class/video4linux', entry.name)
+            try:
+                with open(os.path.join(sysfs_dir, 'index'), 'r') as f:
+                    if f.read().strip() != '0':
+                        continue
+            except OSError:
+                pass
+            
+            try:
+                with open(os.path.join(sysfs_dir, 'name'), 'r') as f:
+                    name = f.read().strip()
+            except OSError:
+                name = entry.name
+            cameras.append({"index": int(suffix), "name": f"{name} ({entry.path})"})
+        
+        cameras.sort(key=lambda c: c["index"])
+        return cameras
+    
+    @staticmethod
+    def _enumerate_macos_cameras() -> List[Dict[str, Union[int, str]]]:
+        """Probe AVFoundation device indices"""
+        cameras = []
+        for idx in range(5):
+            cap = cv2.VideoCapture(idx, cv2.CAP_AVFOUNDATION)
+            try:
+                if cap.isOpened():
+                    cameras.append({"index": idx, "name": f"Camera {idx}"})
+            finally:
+                cap.release()
+        return cameras
+    
+    @staticmethod
+    def _probe_dshow_index(idx: int) -> Optional[Dict[str, int]]:
+        """Open a DirectShow index and report its size if it negotiated a format"""
+        try:
+            cap = cv2.VideoCapture(idx, cv2.CAP_DSHOW)
+            try:
+                if not cap.isOpened():
+                    return None
+                # A negotiated frame size proves the device is usable; reading a frame
+                # would also wait for the sensor's auto-exposure to settle
+                width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                if width <= 0 or height <= 0:
+                    return None
+                logging.info("Successfully opened camera at index %s", idx)
+                return {"index": idx, "width": width, "height": height}
+            finally:
+                cap.release()
+        except Exception as e:
+            logging.debug("Error checking camera %s: %s", idx, e)
+            return None
+    
+    @staticmethod
+    def _query_dshow_camera_names() -> List[str]:
+        """List video input devices in DirectShow order (needs pygrabber)"""
+        import comtypes
+        from pygrabber.dshow_graph import FilterGraph
+        
+        comtypes.CoInitialize()
+        try:
+            return list(FilterGraph().get_input_devices())
+        finally:
+            comtypes.CoUninitialize()
+    
+    @staticmethod
+    def _query_wmi_camera_names() -> List[str]:
+        """Read camera names from WMI over COM, without spawning a process"""
+        import comtypes
+        import comtypes.client
+        
+        comtypes.CoInitialize()
+        try:
+            wmi = comtypes.client.CoGetObject("winmgmts:", dynamic=True)
+            # The name filter runs inside WMI, so only matching devices are marshalled
+            devices = wmi.ExecQuery(
+                "SELECT Name FROM Win32_PnPEntity WHERE PNPClass='Image' AND Status='OK' "
+                "AND (Name LIKE '%camera%' OR Name LIKE '%webcam%' OR Name LIKE '%ivCam%')"
+            )
+            return [
+                name for name in (d.Name for d in devices)
+                if name and not name.lower().startswith('microsoft')  # Filter out virtual cameras
+            ]
+        finally:
+            comtypes.CoUninitialize()
+    
+    @staticmethod
+    def _query_powershell_camera_names() -> List[str]:
+        """Read camera names from Get-PnpDevice in a PowerShell subprocess"""
+        cmd = '''
+        Get-PnpDevice -Class 'Image' -Status 'OK' -FriendlyName '*camera*','*webcam*','*ivCam*' | 
+        Select-Object FriendlyName |
+        ConvertTo-Json -Compress
+        '''
+        result = subprocess.run(
+            ['powershell', '-Command', cmd],
+            capture_output=True,
+            text=True,
+            timeout=2,
+            creationflags=subprocess.CREATE_NO_WINDOW
+        )
+        
+        # ConvertTo-Json emits nothing for no match and a bare object for one
+        if not result.stdout.strip():
+            return []
+        devices = json.loads(result.stdout)
+        if isinstance(devices, dict):
+            devices = [devices]
+        return [
+            d['FriendlyName'] for d in devices
+            if d.get('FriendlyName')
+            and not d['FriendlyName'].lower().startswith('microsoft')  # Filter out virtual cameras
+        ]
+    
+    @staticmethod
+    def _enumerate_windows_cameras() -> List[Dict[str, Union[int, str]]]:
+        """List DirectShow cameras, probing indices only when pygrabber is unavailable"""
+        # DirectShow's own device order is what OpenCV's CAP_DSHOW index refers to,
+        # so listing it names every index without opening a single camera
+        try:
+            dshow_names = SourceFactory._query_dshow_camera_names()
+        except Exception as e:
+            logging.debug("DirectShow enumeration unavailable: %s", e)
+            dshow_names = None
+        
+        if dshow_names is not None:
+            logging.info("Found DirectShow cameras: %s", dshow_names)
+            # Filter out virtual cameras, keeping the DirectShow index of the rest
+            return [
+                {"index": idx, "name": name}
+                for idx, name in enumerate(dshow_names)
+                if not name.lower().startswith('microsoft')
+            ]
+        
+        cameras = []
+        
+        # Probe the first 3 indices concurrently, overlapping the name query;
+        # DirectShow opens block in C, not on the GIL
+        probes = [SourceFactory._get_executor().submit(SourceFactory._probe_dshow_index, idx)
+                  for idx in range(3)]
+        
+        # Get camera names via WMI, falling back to PowerShell
+        try:
+            camera_names = SourceFactory._query_wmi_camera_names()
+        except Exception as e:
+            logging.debug("WMI query failed, using PowerShell: %s", e)
+            camera_names = SourceFactory._query_powershell_camera_names()
+        
+        logging.info("Found camera names from Windows: %s", camera_names)
+        found_cameras = [info for info in (p.result() for p in probes) if info]
+        
+        # PnP order is not DirectShow order; pair them by position as a last resort
+        for i, name in enumerate(camera_names):
+            if i < len(found_cameras):
+                camera_info = found_cameras[i]
+                name = f"{name} ({camera_info['width']}x{camera_info['height']})"
+                cameras.append({"index": camera_info['index'], "name": name})
         
-        return cameras 
\ No newline at end of file
+        return cameras
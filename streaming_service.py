@@ -3,17 +3,250 @@ import asyncio
 import cv2
 import logging
 from flask import Flask, Response
+from werkzeug.serving import WSGIRequestHandler
 import websockets
-from typing import Generator, AsyncGenerator
-from source_manager import VideoSource
+from typing import Callable, Dict, Optional
 import time
 import threading
+import functools
+from fractions import Fraction
+
+# Multipart framing around each JPEG in the MJPEG stream; the part's
+# Content-Length lets clients and proxies take each frame without scanning
+FRAME_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n'
+FRAME_TRAILER = b'\r\n'
+
+# Keep caches and reverse proxies (nginx honours X-Accel-Buffering) from
+# holding frames back; the servers already send each part as its own chunk
+STREAM_HEADERS = {'Cache-Control': 'no-cache, no-store', 'X-Accel-Buffering': 'no'}
+
+# Optional ASGI stack; when present the MJPEG stream runs on one event loop
+# instead of a Werkzeug thread per client
+try:
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.responses import HTMLResponse, StreamingResponse
+    from starlette.routing import Route
+except ImportError:
+    uvicorn = None
+
+# Optional libuv event loop for the WebSocket services (not available on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Optional GPU JPEG encoder (pynvjpeg)
+try:
+    from nvjpeg import NvJpeg
+except ImportError:
+    NvJpeg = None
+
+# Optional direct libjpeg-turbo binding (PyTurboJPEG)
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+except ImportError:
+    TurboJPEG = None
+
+# Optional PyAV, for H.264 on the WebSocket stream
+try:
+    import av
+except ImportError:
+    av = None
+
+# H.264 encoders tried in order, with their lowest-latency settings
+H264_CODECS = {
+    'h264_nvenc': {'preset': 'p1', 'tune': 'ull', 'zerolatency': '1'},
+    'libx264': {'preset': 'ultrafast', 'tune': 'zerolatency'},
+}
+
+@functools.lru_cache(maxsize=1)
+def _log_opencv_jpeg_backend() -> None:
+    """Log once whether OpenCV's JPEG codec is the SIMD libjpeg-turbo build"""
+    if 'libjpeg-turbo' in cv2.getBuildInformation():
+        logging.info("OpenCV JPEG codec: libjpeg-turbo")
+    else:
+        logging.warning("OpenCV is not built with libjpeg-turbo; JPEG encoding will be slower "
+                        "(the opencv-python wheels bundle it)")
+
+class JpegEncoder:
+    """Encodes BGR frames to JPEG on the CPU with OpenCV"""
+    
+    def __init__(self, quality: int, max_width: int = 0):
+        self.quality = quality
+        self.max_width = max_width
+        self._scaled = None
+        # Optimized Huffman tables cost an extra pass per frame, so keep them off
+        self._params = [int(cv2.IMWRITE_JPEG_QUALITY), quality,
+                        int(cv2.IMWRITE_JPEG_OPTIMIZE), 0]
+    
+    def _downscale(self, frame):
+        """Shrink frames wider than max_width, keeping the aspect ratio"""
+        height, width = frame.shape[:2]
+        if not self.max_width or width <= self.max_width:
+            return frame
+        size = (self.max_width, max(1, height * self.max_width // width))
+        # Fewer pixels to encode and send; the output buffer is reused per frame
+        dst = self._scaled if self._scaled is not None and self._scaled.shape[1::-1] == size else None
+        self._scaled = cv2.resize(frame, size, dst=dst, interpolation=cv2.INTER_AREA)
+        return self._scaled
+    
+    def encode(self, frame):
+        """Return the JPEG as a bytes-like object, or None on failure"""
+        # Frames stay BGR: imencode expects BGR, so no color conversion here
+        ret, buffer = cv2.imencode('.jpg', self._downscale(frame), self._params)
+        return buffer if ret else None
+
+class GpuJpegEncoder(JpegEncoder):
+    """Encodes BGR frames to JPEG on an NVIDIA GPU with nvJPEG"""
+    
+    def __init__(self, quality: int, max_width: int = 0):
+        super().__init__(quality, max_width)
+        # Handles, encoder state and parameters are created once and reused per frame
+        self._nvjpeg = NvJpeg()
+    
+    def encode(self, frame):
+        return self._nvjpeg.encode(self._downscale(frame), self.quality)
+
+class TurboJpegEncoder(JpegEncoder):
+    """Encodes BGR frames to JPEG by calling libjpeg-turbo directly through PyTurboJPEG"""
+    
+    def __init__(self, quality: int, max_width: int = 0):
+        super().__init__(quality, max_width)
+        # Loads the shared library once; only the producer thread encodes
+        self._turbojpeg = TurboJPEG()
+    
+    def encode(self, frame):
+        # libjpeg-turbo reads BGR natively, so no channel shuffle happens
+        return self._turbojpeg.encode(self._downscale(frame), quality=self.quality,
+                                      pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420)
+
+def create_jpeg_encoder(quality: int, max_width: int = 0) -> JpegEncoder:
+    """Use nvJPEG on the GPU, then PyTurboJPEG, then OpenCV, whichever loads first"""
+    if NvJpeg is not None:
+        try:
+            encoder = GpuJpegEncoder(quality, max_width)
+            logging.info("JPEG encoder: nvJPEG")
+            return encoder
+        except Exception as e:
+            logging.warning("nvJPEG unavailable, encoding on the CPU: %s", e)
+    if TurboJPEG is not None:
+        try:
+            encoder = TurboJpegEncoder(quality, max_width)
+            logging.info("JPEG encoder: PyTurboJPEG")
+            return encoder
+        except Exception as e:
+            logging.warning("PyTurboJPEG unavailable, encoding with OpenCV: %s", e)
+    _log_opencv_jpeg_backend()
+    return JpegEncoder(quality, max_width)
+
+class H264Frame(bytes):
+    """One encoded H.264 frame, tagged so senders can resync on a keyframe"""
+    keyframe = False
+    index = 0
+
+class H264Encoder:
+    """Encodes BGR frames to an H.264 Annex B stream with PyAV, on NVENC when available"""
+    
+    def __init__(self, quality: int, max_width: int = 0, fps: int = 30):
+        self.quality = quality
+        self.max_width = max_width
+        self.fps = fps
+        self._context = None
+        self._fallback = None
+        self._pts = 0
+        self._index = 0
+    
+    def _open(self, width: int, height: int):
+        """Open the first usable encoder; PyAV scales and converts frames to its size"""
+        if self.max_width and width > self.max_width:
+            width, height = self.max_width, height * self.max_width // width
+        for name, options in H264_CODECS.items():
+            try:
+                context = av.CodecContext.create(name, 'w')
+                # 4:2:0 needs even dimensions
+                context.width = width & ~1
+                context.height = height & ~1
+                context.pix_fmt = 'yuv420p'
+                context.framerate = self.fps
+                context.time_base = Fraction(1, self.fps)
+                # A keyframe every second lets new clients start decoding quickly;
+                # without global headers each keyframe repeats SPS/PPS
+                context.gop_size = self.fps
+                context.max_b_frames = 0
+                context.options = options
+                context.open()
+                logging.info("H.264 encoder: %s", name)
+                return context
+            except Exception as e:
+                logging.warning("H.264 encoder %s unavailable: %s", name, e)
+        raise RuntimeError("No H.264 encoder available")
+    
+    def encode(self, frame):
+        """Return the encoded frame as an H264Frame, or None if the encoder has none yet"""
+        if self._fallback is not None:
+            return self._fallback.encode(frame)
+        if self._context is None:
+            height, width = frame.shape[:2]
+            try:
+                self._context = self._open(width, height)
+            except Exception as e:
+                logging.error("Cannot encode H.264, streaming JPEG instead: %s", e)
+                self._fallback = create_jpeg_encoder(self.quality, self.max_width)
+                return self._fallback.encode(frame)
+        video_frame = av.VideoFrame.from_ndarray(frame, format='bgr24')
+        video_frame.pts = self._pts
+        self._pts += 1
+        packets = self._context.encode(video_frame)
+        if not packets:
+            return None
+        encoded = H264Frame(b''.join(bytes(packet) for packet in packets))
+        encoded.keyframe = any(packet.is_keyframe for packet in packets)
+        encoded.index = self._index
+        self._index += 1
+        return encoded
+
+def create_frame_encoder(codec: str, quality: int, max_width: int = 0):
+    """Use H.264 when asked for and PyAV is installed, else JPEG"""
+    if codec == 'h264':
+        if av is not None:
+            return H264Encoder(quality, max_width)
+        logging.warning("PyAV is not installed, streaming JPEG instead of H.264")
+    return create_jpeg_encoder(quality, max_width)
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """Create an event loop, preferring uvloop's faster I/O and timers"""
+    if uvloop is not None:
+        return uvloop.new_event_loop()
+    return asyncio.new_event_loop()
+
+class _StreamRequestHandler(WSGIRequestHandler):
+    """Werkzeug handler with Nagle off, so each MJPEG part leaves immediately"""
+    disable_nagle_algorithm = True
 
 class StreamingService(ABC):
     """Abstract base class for streaming services"""
     
+    # Longest stop() or a restart waits for the previous run's thread to exit
+    STOP_TIMEOUT = 2.0
+    
     def __init__(self):
         self._is_running = False
+        # Called with the number of connected clients whenever it changes
+        self.on_clients_changed: Optional[Callable[[int], None]] = None
+    
+    def _notify_clients(self, count: int) -> None:
+        """Report the connected client count to whoever feeds the frames"""
+        callback = self.on_clients_changed
+        if callback is not None:
+            callback(count)
+    
+    def _join_run(self, thread) -> bool:
+        """Wait for a run's server thread to exit; False if it is still shutting down"""
+        if thread is None or thread is threading.current_thread():
+            return True
+        thread.join(timeout=self.STOP_TIMEOUT)
+        return not thread.is_alive()
     
     @abstractmethod
     def start(self, frame_generator) -> bool:
@@ -29,221 +262,145 @@ class StreamingService(ABC):
         """Check if the service is running"""
         return self._is_running
 
-class HTTPStreamingService(StreamingService):
-    def __init__(self, video_source: VideoSource):
-        self.video_source = video_source
-        self.flask_app = None
-        self.http_server = None
-        self._is_running = False
-    
-    def generate_frames(self) -> Generator[bytes, None, None]:
-        """Generate frames for HTTP streaming"""
-        try:
-            while self._is_running:
-                ret, frame = self.video_source.read_frame()
-                if not ret:
-                    break
-                    
-                ret, buffer = cv2.imencode('.jpg', frame)
-                if ret:
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
-        except Exception as e:
-            logging.error(f"Error generating frames: {str(e)}")
+class _LatestFrame:
+    """Per-client single-slot mailbox; a newer frame replaces one not yet sent"""
     
-    def start(self, host: str, port: int) -> None:
-        try:
-            self.flask_app = Flask(__name__)
-            
-            @self.flask_app.route('/')
-            def index():
-                return """
-                <html>
-                  <body>
-                    <img src="/video_feed" width="100%">
-                  </body>
-                </html>
-                """
-            
-            @self.flask_app.route('/video_feed')
-            def video_feed():
-                return Response(
-                    self.generate_frames(),
-                    mimetype='multipart/x-mixed-replace; boundary=frame'
-                )
-            
-            from werkzeug.serving import make_server
-            import socket
-
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            sock.bind((host, port))
-            
-            self.http_server = make_server(host, port, self.flask_app, threaded=True)
-            self.http_server._socket = sock
-            
-            self._is_running = True
-            self.http_server.serve_forever()
-            
-        except Exception as e:
-            logging.error(f"Error starting HTTP server: {str(e)}")
-            self.stop()
-    
-    def stop(self) -> None:
-        self._is_running = False
-        try:
-            if self.http_server:
-                self.http_server.shutdown()
-                self.http_server.server_close()
-                self.http_server = None
-            
-            if self.flask_app:
-                self.flask_app = None
-                
-        except Exception as e:
-            logging.error(f"Error stopping HTTP server: {str(e)}")
-    
-    def is_running(self) -> bool:
-        return self._is_running
-
-class WebSocketStreamingService(StreamingService):
-    def __init__(self, video_source: VideoSource):
-        self.video_source = video_source
-        self.ws_server = None
-        self.loop = None
-        self._is_running = False
-    
-    async def handle_client(self, websocket) -> None:
-        """Handle WebSocket client connection"""
-        try:
-            logging.info("New WebSocket client connected")
-            async for frame in self.generate_frames():
-                if not self._is_running:
-                    break
-                try:
-                    await websocket.send(frame)
-                    await asyncio.sleep(0.033)  # ~30 FPS
-                except websockets.exceptions.ConnectionClosed:
-                    logging.info("WebSocket client disconnected")
-                    break
-        except Exception as e:
-            logging.error(f"Error in WebSocket handler: {str(e)}")
-        finally:
-            logging.info("WebSocket connection closed")
-    
-    async def generate_frames(self) -> AsyncGenerator[bytes, None]:
-        """Generate frames for WebSocket streaming"""
-        try:
-            while self._is_running:
-                ret, frame = self.video_source.read_frame()
-                if not ret:
-                    break
-                    
-                ret, buffer = cv2.imencode('.jpg', frame)
-                if ret:
-                    yield buffer.tobytes()
-                await asyncio.sleep(0.033)  # ~30 FPS
-        except Exception as e:
-            logging.error(f"Error generating frames: {str(e)}")
-    
-    def start(self, host: str, port: int) -> None:
-        async def serve():
-            self.ws_server = await websockets.serve(self.handle_client, host, port)
-            await self.ws_server.wait_closed()
-        
-        try:
-            self.loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.loop)
-            
-            self._is_running = True
-            self.loop.run_until_complete(serve())
-            self.loop.run_forever()
-        except Exception as e:
-            logging.error(f"Error starting WebSocket server: {str(e)}")
-            self.stop()
+    def __init__(self):
+        self.frame = None
+        self.ready = asyncio.Event()
     
-    def stop(self) -> None:
-        self._is_running = False
-        try:
-            if self.ws_server and not self.loop.is_closed():
-                self.loop.run_until_complete(self.ws_server.close())
-                self.ws_server = None
-            
-            if self.loop:
-                if self.loop.is_running():
-                    self.loop.stop()
-                if not self.loop.is_closed():
-                    pending = asyncio.all_tasks(self.loop)
-                    self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-                    self.loop.close()
-                self.loop = None
-        except Exception as e:
-            logging.error(f"Error stopping WebSocket server: {str(e)}")
+    def put(self, frame) -> None:
+        self.frame = frame
+        self.ready.set()
     
-    def is_running(self) -> bool:
-        return self._is_running
+    async def get(self):
+        await self.ready.wait()
+        self.ready.clear()
+        return self.frame
 
 class WebSocketService(StreamingService):
     """WebSocket streaming service"""
     
+    # A send slower than this is abandoned; the client gets the next frame instead
+    SEND_TIMEOUT = 0.5
+    # Clients that time out this many sends in a row are disconnected
+    STALL_LIMIT = 4
+    # Shortest gap between broadcast frames (~30 FPS)
+    FRAME_INTERVAL = 1 / 30
+    # A client that does not answer the closing handshake in time is dropped,
+    # instead of holding stop() for websockets' 10 s default
+    CLOSE_TIMEOUT = 0.5
+    
     def __init__(self, host: str, port: int):
         super().__init__()
         self.host = host
         self.port = port
         self.server = None
         self.loop = None
-        self.clients = set()
+        self.server_thread = None
+        self.clients: Dict[object, _LatestFrame] = {}
         self.frame_generator = None
     
     async def broadcast_frames(self):
         """Broadcast frames to all connected clients"""
+        # One shared iterator over the producer's encoded frames; JPEGs are
+        # encoded once upstream and only sent here. Each frame goes out as
+        # soon as it is published
+        frames = self.frame_generator()
+        loop = asyncio.get_running_loop()
+        last_broadcast = 0.0
         while self._is_running:
             if not self.clients:
                 await asyncio.sleep(0.1)
                 continue
                 
             try:
-                frame = next(self.frame_generator())
+                # Waiting for the next frame blocks, so keep it off the event loop
+                frame = await loop.run_in_executor(None, next, frames, None)
+                if frame is None:
+                    break
                 if frame:
-                    # Broadcast to all clients
-                    disconnected = set()
-                    for client in self.clients:
-                        try:
-                            await client.send(frame)
-                        except websockets.exceptions.ConnectionClosed:
-                            disconnected.add(client)
-                    
-                    # Remove disconnected clients
-                    self.clients.difference_update(disconnected)
-                    
-                await asyncio.sleep(0.033)  # ~30 FPS
-            except StopIteration:
-                continue
+                    # Hand the frame to every client's mailbox; a slow client
+                    # skips frames instead of holding up the others
+                    for mailbox in list(self.clients.values()):
+                        mailbox.put(frame)
+                
+                # Cap the rate at ~30 FPS; this only waits when frames arrive
+                # faster than that, so a paced producer adds no delay
+                now = loop.time()
+                delay = self.FRAME_INTERVAL - (now - last_broadcast)
+                last_broadcast = now
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    last_broadcast += delay
             except Exception as e:
                 logging.error(f"Error broadcasting frames: {str(e)}")
                 break
     
+    async def _send_frames(self, websocket, mailbox: _LatestFrame) -> None:
+        """Send each client the newest frame available when it is ready for one"""
+        stalls = 0
+        # H.264 frames depend on earlier ones: a client that joins late or misses
+        # one waits for the next keyframe. JPEGs carry no index and always go out
+        last_index = None
+        while self._is_running:
+            frame = await mailbox.get()
+            encoded = getattr(frame, 'obj', frame)
+            if isinstance(encoded, H264Frame):
+                in_sequence = last_index is not None and encoded.index == last_index + 1
+                if not (in_sequence or encoded.keyframe):
+                    last_index = None
+                    continue
+                last_index = encoded.index
+            try:
+                await asyncio.wait_for(websocket.send(frame), timeout=self.SEND_TIMEOUT)
+                stalls = 0
+            except asyncio.TimeoutError:
+                # The frame may not have arrived whole; resync on the next keyframe
+                last_index = None
+                stalls += 1
+                if stalls >= self.STALL_LIMIT:
+                    logging.warning("Disconnecting stalled client %s", websocket.remote_address)
+                    await websocket.close(1008, "client too slow")
+                    break
+            except websockets.exceptions.ConnectionClosed:
+                break
+    
     async def handler(self, websocket):
         """Handle WebSocket connection"""
+        mailbox = _LatestFrame()
+        sender = asyncio.create_task(self._send_frames(websocket, mailbox))
         try:
-            self.clients.add(websocket)
+            self.clients[websocket] = mailbox
+            self._notify_clients(len(self.clients))
             logging.info(f"Client connected. Total clients: {len(self.clients)}")
             await websocket.wait_closed()
         finally:
-            self.clients.remove(websocket)
+            sender.cancel()
+            self.clients.pop(websocket, None)
+            self._notify_clients(len(self.clients))
             logging.info(f"Client disconnected. Total clients: {len(self.clients)}")
     
     async def run_server(self):
         """Run the WebSocket server"""
-        async with websockets.serve(self.handler, self.host, self.port):
+        # JPEG is already compressed; permessage-deflate would only burn CPU
+        async with websockets.serve(self.handler, self.host, self.port, compression=None,
+                                    close_timeout=self.CLOSE_TIMEOUT) as server:
+            self.server = server
             self.broadcast_task = asyncio.create_task(self.broadcast_frames())
-            await asyncio.Future()  # run forever
+            # Runs until cleanup_server closes the listening socket
+            await server.wait_closed()
     
     def start(self, frame_generator) -> bool:
         """Start WebSocket server"""
         if self._is_running:
             logging.warning("WebSocket server is already running")
             return False
+        
+        # A service is reused across restarts; the last run must be fully torn down
+        if not self._join_run(self.server_thread):
+            logging.error("Previous WebSocket server on port %s is still shutting down", self.port)
+            return False
             
         try:
             self.frame_generator = frame_generator
@@ -251,20 +408,23 @@ class WebSocketService(StreamingService):
             logging.info(f"WebSocket server starting on port {self.port}")
             
             # Run in a separate thread
+            # The loop stays local to this run, so its teardown never touches a later one
+            loop = _new_event_loop()
+            self.loop = loop
+            
             def run():
                 try:
-                    self.loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(self.loop)
-                    self.loop.run_until_complete(self.run_server())
+                    asyncio.set_event_loop(loop)
+                    loop.run_until_complete(self.run_server())
                 except Exception as e:
-                    logging.error(f"Error in WebSocket server thread: {str(e)}")
-                    self._is_running = False
+                    logging.error("Error in WebSocket server thread: %s", e)
+                    if self.loop is loop:
+                        self._is_running = False
                 finally:
-                    if self.loop and not self.loop.is_closed():
-                        self.loop.close()
-                    self.loop = None
+                    loop.close()
+                    if self.loop is loop:
+                        self.loop = None
             
-            import threading
             self.server_thread = threading.Thread(target=run)
             self.server_thread.daemon = True
             self.server_thread.start()
@@ -286,25 +446,18 @@ class WebSocketService(StreamingService):
             logging.info("Shutting down WebSocket server...")
             self._is_running = False
             
-            # Stop the event loop from the main thread
-            if self.loop and self.loop.is_running():
-                asyncio.run_coroutine_threadsafe(
-                    self.cleanup_server(),
-                    self.loop
-                )
+            # Close clients and the listener on the server's loop, and wait for it,
+            # so nothing from this run is left to race a restart
+            loop = self.loop
+            if loop and loop.is_running():
+                future = asyncio.run_coroutine_threadsafe(self.cleanup_server(), loop)
+                try:
+                    future.result(timeout=self.STOP_TIMEOUT)
+                except Exception as e:
+                    logging.error("Error closing WebSocket clients: %s", e)
             
-            # Kill any remaining processes using the port
-            try:
-                import psutil
-                for proc in psutil.process_iter(['pid', 'name', 'connections']):
-                    try:
-                        for conn in proc.connections():
-                            if conn.laddr.port == self.port:
-                                psutil.Process(proc.pid).terminate()
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        pass
-            except Exception as e:
-                logging.error(f"Error killing processes: {str(e)}")
+            if not self._join_run(self.server_thread):
+                logging.warning("WebSocket server thread is still shutting down")
             
             logging.info("WebSocket server stopped successfully")
             
@@ -314,9 +467,18 @@ class WebSocketService(StreamingService):
     async def cleanup_server(self):
         """Cleanup server resources"""
         # Close all client connections
-        if self.clients:
-            await asyncio.gather(*[client.close() for client in self.clients])
+        clients = list(self.clients)
+        if clients:
+            try:
+                await asyncio.wait_for(asyncio.gather(*[client.close() for client in clients],
+                                                      return_exceptions=True),
+                                       timeout=self.CLOSE_TIMEOUT * 2)
+            except asyncio.TimeoutError:
+                # Drop whoever is left without waiting for them
+                for client in clients:
+                    client.transport.abort()
             self.clients.clear()
+            self._notify_clients(0)
         
         # Cancel broadcast task if it exists
         if hasattr(self, 'broadcast_task') and not self.broadcast_task.done():
@@ -325,6 +487,11 @@ class WebSocketService(StreamingService):
                 await self.broadcast_task
             except asyncio.CancelledError:
                 pass
+        
+        # Release the port; run_server returns once the listener is closed
+        if self.server:
+            self.server.close()
+            self.server = None
 
 class StreamingServiceFactory:
     """Factory for creating streaming services"""
@@ -345,6 +512,18 @@ class StreamingServiceFactory:
         else:
             raise ValueError(f"Unknown protocol: {protocol}")
 
+# Page served at / by the live HTTP service, encoded once at import
+INDEX_HTML = b"""
+                <html>
+                  <body>
+                    <img src="/video_feed" width="100%">
+                  </body>
+                </html>
+                """
+
+# The page never changes while the app runs, so let browsers keep it
+INDEX_HEADERS = {'Cache-Control': 'public, max-age=3600'}
+
 class HTTPService(StreamingService):
     """HTTP streaming service using Flask"""
     
@@ -357,51 +536,113 @@ class HTTPService(StreamingService):
         self._lock = threading.Lock()
         self._cleanup_event = threading.Event()
         self._server_thread = None
+        self._asgi_server = None
+        self._asgi_app = None
+        self._frame_generator = None
+        self._last_part = (None, b'')
         logging.info("HTTPService initialized")
     
+    def _build_part(self, frame) -> bytes:
+        """Return the multipart chunk for a frame, built once and shared by all clients"""
+        cached_frame, part = self._last_part
+        if frame is not cached_frame:
+            # One copy into the part; chained + would copy the frame twice
+            part = b''.join((FRAME_HEADER % len(frame), frame, FRAME_TRAILER))
+            self._last_part = (frame, part)
+        return part
+    
+    def _create_flask_app(self) -> Flask:
+        """Build the Flask app serving the page and the MJPEG stream"""
+        app = Flask(__name__)
+        
+        @app.route('/')
+        def index():
+            logging.info("New client connected to root")
+            return Response(INDEX_HTML, mimetype='text/html', headers=INDEX_HEADERS)
+        
+        @app.route('/video_feed')
+        def video_feed():
+            with self._lock:
+                self.active_connections += 1
+                self._notify_clients(self.active_connections)
+                logging.info("New video feed connection. Total connections: %s", self.active_connections)
+        
+            def generate():
+                try:
+                    for frame in self._frame_generator():
+                        if not self._is_running or self._cleanup_event.is_set():
+                            break
+                        yield self._build_part(frame)
+                except Exception as e:
+                    logging.error("Error in video feed generator: %s", e)
+                finally:
+                    with self._lock:
+                        self.active_connections -= 1
+                        self._notify_clients(self.active_connections)
+                        logging.info("Video feed connection closed. Total connections: %s", self.active_connections)
+        
+            return Response(
+                generate(),
+                mimetype='multipart/x-mixed-replace; boundary=frame',
+                headers=STREAM_HEADERS,
+                direct_passthrough=True
+            )
+        
+        return app
+    
+    def _create_asgi_app(self) -> "Starlette":
+        """Build the Starlette app serving the page and the MJPEG stream"""
+        async def index(request):
+            logging.info("New client connected to root")
+            return HTMLResponse(INDEX_HTML, headers=INDEX_HEADERS)
+        
+        async def video_feed(request):
+            with self._lock:
+                self.active_connections += 1
+                self._notify_clients(self.active_connections)
+                logging.info("New video feed connection. Total connections: %s", self.active_connections)
+        
+            async def generate():
+                frames = self._frame_generator()
+                loop = asyncio.get_running_loop()
+                try:
+                    while self._is_running and not self._cleanup_event.is_set():
+                        # Waiting for the producer blocks, so keep it off the event loop
+                        frame = await loop.run_in_executor(None, next, frames, None)
+                        if frame is None:
+                            break
+                        yield self._build_part(frame)
+                except Exception as e:
+                    logging.error("Error in video feed generator: %s", e)
+                finally:
+                    with self._lock:
+                        self.active_connections -= 1
+                        self._notify_clients(self.active_connections)
+                        logging.info("Video feed connection closed. Total connections: %s", self.active_connections)
+        
+            return StreamingResponse(generate(), media_type='multipart/x-mixed-replace; boundary=frame',
+                                     headers=STREAM_HEADERS)
+        
+        return Starlette(routes=[Route('/', index), Route('/video_feed', video_feed)])
+    
     def start(self, frame_generator) -> bool:
         if self._is_running:
             logging.warning("HTTP server is already running")
             return False
+        
+        # A service is reused across restarts; the last run must be fully torn down
+        if not self._join_run(self._server_thread):
+            logging.error("Previous HTTP server on port %s is still shutting down", self.port)
+            return False
+        
+        if uvicorn is not None:
+            return self._start_asgi(frame_generator)
             
         try:
-            self.flask_app = Flask(__name__)
-            
-            @self.flask_app.route('/')
-            def index():
-                logging.info("New client connected to root")
-                return """
-                <html>
-                  <body>
-                    <img src="/video_feed" width="100%">
-                  </body>
-                </html>
-                """
-            
-            @self.flask_app.route('/video_feed')
-            def video_feed():
-                with self._lock:
-                    self.active_connections += 1
-                    logging.info(f"New video feed connection. Total connections: {self.active_connections}")
-                
-                def generate():
-                    try:
-                        for frame in frame_generator():
-                            if not self._is_running or self._cleanup_event.is_set():
-                                break
-                            yield (b'--frame\r\n'
-                                   b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
-                    except Exception as e:
-                        logging.error(f"Error in video feed generator: {str(e)}")
-                    finally:
-                        with self._lock:
-                            self.active_connections -= 1
-                            logging.info(f"Video feed connection closed. Total connections: {self.active_connections}")
-                
-                return Response(
-                    generate(),
-                    mimetype='multipart/x-mixed-replace; boundary=frame'
-                )
+            # Routes are registered once; a restart only swaps the frame source
+            if self.flask_app is None:
+                self.flask_app = self._create_flask_app()
+            self._frame_generator = frame_generator
             
             # Use a thread-safe way to run the server
             from werkzeug.serving import make_server
@@ -413,7 +654,8 @@ class HTTPService(StreamingService):
             sock.bind(('0.0.0.0', self.port))
             
             # Create server with the socket
-            self.http_server = make_server('0.0.0.0', self.port, self.flask_app, threaded=True)
+            self.http_server = make_server('0.0.0.0', self.port, self.flask_app, threaded=True,
+                                           request_handler=_StreamRequestHandler)
             self.http_server._socket = sock  # Use the pre-bound socket
             
             logging.info(f"HTTP server starting on port {self.port}")
@@ -421,13 +663,18 @@ class HTTPService(StreamingService):
             self._cleanup_event.clear()
             
             # Run server in a separate thread
+            server = self.http_server
+            
             def run_server():
                 try:
-                    self.http_server.serve_forever()
+                    server.serve_forever()
                 except Exception as e:
-                    logging.error(f"Error in server thread: {str(e)}")
+                    logging.error("Error in server thread: %s", e)
                 finally:
-                    self._cleanup()
+                    # stop() detaches the server first; only a run that ended by
+                    # itself still owns it and has to tear it down here
+                    if self.http_server is server:
+                        self._cleanup()
             
             self._server_thread = threading.Thread(target=run_server)
             self._server_thread.daemon = True
@@ -440,6 +687,52 @@ class HTTPService(StreamingService):
             self._cleanup()
             return False
     
+    def _start_asgi(self, frame_generator) -> bool:
+        """Serve the stream with Starlette on uvicorn"""
+        try:
+            if self._asgi_app is None:
+                self._asgi_app = self._create_asgi_app()
+            self._frame_generator = frame_generator
+            
+            # Bind here so a busy port fails start() instead of the server thread
+            import socket
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(('0.0.0.0', self.port))
+            
+            # loop/http 'auto' pick uvloop and httptools when they are installed
+            config = uvicorn.Config(self._asgi_app, loop='auto', http='auto', log_level='warning')
+            self._asgi_server = uvicorn.Server(config)
+            
+            logging.info("HTTP server (ASGI) starting on port %s", self.port)
+            self._is_running = True
+            self._cleanup_event.clear()
+            
+            asgi_server = self._asgi_server
+            
+            def run_server():
+                try:
+                    asgi_server.run(sockets=[sock])
+                except BaseException as e:
+                    logging.error("Error in server thread: %s", e)
+                finally:
+                    sock.close()
+                    # stop() detaches the server first; only a run that ended by
+                    # itself still owns it and has to tear it down here
+                    if self._asgi_server is asgi_server:
+                        self._cleanup()
+            
+            self._server_thread = threading.Thread(target=run_server)
+            self._server_thread.daemon = True
+            self._server_thread.start()
+            
+            return True
+            
+        except Exception as e:
+            logging.error("HTTP server error: %s", e)
+            self._cleanup()
+            return False
+    
     def _cleanup(self) -> None:
         """Internal cleanup method"""
         try:
@@ -454,34 +747,23 @@ class HTTPService(StreamingService):
                     logging.info(f"Waiting for {self.active_connections} active connections to close...")
                     time.sleep(1)  # Give connections time to close
             
+            # Detach each server before stopping it, so its thread's exit sees
+            # that the teardown is already handled and does not run it again
+            asgi_server, self._asgi_server = self._asgi_server, None
+            http_server, self.http_server = self.http_server, None
+            
+            # Ask uvicorn to finish; its thread exits on its own
+            if asgi_server:
+                asgi_server.should_exit = True
+            
             # Shutdown server
-            if self.http_server:
+            if http_server:
                 try:
                     logging.info("Shutting down HTTP server...")
-                    self.http_server.shutdown()
-                    self.http_server.server_close()
+                    http_server.shutdown()
+                    http_server.server_close()
                 except Exception as e:
-                    logging.error(f"Error during server shutdown: {str(e)}")
-                finally:
-                    self.http_server = None
-            
-            # Cleanup Flask app
-            if self.flask_app:
-                self.flask_app = None
-            
-            # Kill any remaining processes using the port
-            try:
-                import psutil
-                for proc in psutil.process_iter(['pid', 'name', 'connections']):
-                    try:
-                        for conn in proc.connections():
-                            if conn.laddr.port == self.port:
-                                logging.info(f"Terminating process {proc.pid} using port {self.port}")
-                                psutil.Process(proc.pid).terminate()
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        pass
-            except Exception as e:
-                logging.error(f"Error killing processes: {str(e)}")
+                    logging.error("Error during server shutdown: %s", e)
             
             # Reset state
             self._is_running = False
@@ -499,4 +781,6 @@ class HTTPService(StreamingService):
             logging.warning("HTTP server is not running")
             return
         
-        self._cleanup() 
\ No newline at end of file
+        self._cleanup()
+        if not self._join_run(self._server_thread):
+            logging.warning("HTTP server thread is still shutting down") 
\ No newline at end of file